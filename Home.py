@@ -1,14 +1,36 @@
+import time
+
+start_time = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-import os
-import json
-from src.arxiv_search import search_arxiv, display_arxiv_results
-from src.translator import translate
-from src.utils import load_csv
-from langchain_community.document_loaders import ArxivLoader
+from src.startup_profile import (
+    profile_enabled,
+    profile_imports,
+    render_startup_profile,
+)
+
+with profile_imports() as import_times:
+    import pandas as pd
+    import os
+    from src.arxiv_search import (
+        SORT_OPTIONS,
+        search_arxiv,
+        prefetch_arxiv_page,
+        display_arxiv_results,
+    )
+    from src.translator import translate_abstract
+    from src.utils import load_csv
+    from src.prefetch import prefetch_paper
+    from dotenv import load_dotenv
+
+# 백그라운드 prefetch와 Review 페이지의 OpenAI 호출이 사용할 API 키를 불러옴
+load_dotenv()
 
 
 def load_arxiv(arxiv_id, with_meta=True):
+    # 무거운 LangChain 모듈은 처음 사용할 때 import
+    from langchain_community.document_loaders import ArxivLoader
+
     try:
         # arxiv_id 형식 표준화
         # 가끔 'v1'과 같은 버전 정보가 포함되어 있을 수 있음
@@ -73,14 +95,44 @@ def save_paper_to_csv(arxiv_id, arxiv_data):
 
 
 def handle_arxiv_search(query):
-    results = search_arxiv(query)
-    summary_button = st.checkbox("Full Summary", False)
-
+    col = st.columns([1, 1, 1])
+    with col[0]:
+        summary_button = st.checkbox("Full Summary", False)
+    with col[1]:
+        page_size = st.selectbox("페이지당 결과 수", [5, 10, 20, 50], index=1)
+    with col[2]:
+        sort_by = st.selectbox("정렬", list(SORT_OPTIONS.keys()))
+
+    search_key = (query, page_size, sort_by)
     if st.button("검색"):
-        if results:
-            display_arxiv_results(results, summary_button)
-        else:
+        st.session_state.arxiv_search = search_key
+        st.session_state.arxiv_page = 0
+
+    # 검색어나 옵션이 바뀌면 이전 검색 결과는 숨김
+    if query and st.session_state.arxiv_search == search_key:
+        page = st.session_state.arxiv_page
+        count = display_arxiv_results(
+            search_arxiv(query, page, page_size, sort_by), summary_button
+        )
+        if count == 0:
             st.write("검색 결과가 없습니다. 다른 검색어를 입력해주세요.")
+        elif count == page_size:
+            # 현재 페이지를 읽는 동안 다음 페이지를 미리 받아둠
+            prefetch_arxiv_page(query, page + 1, page_size, sort_by)
+
+        nav = st.columns([1, 1, 1])
+        with nav[0]:
+            if st.button("이전 페이지", disabled=page == 0, use_container_width=True):
+                st.session_state.arxiv_page -= 1
+                st.experimental_rerun()
+        with nav[1]:
+            st.markdown(f"<center>{page + 1} 페이지</center>", unsafe_allow_html=True)
+        with nav[2]:
+            if st.button(
+                "다음 페이지", disabled=count < page_size, use_container_width=True
+            ):
+                st.session_state.arxiv_page += 1
+                st.experimental_rerun()
 
     if st.session_state.axiv_id is not None and len(st.session_state.axiv_id) > 0:
         arxiv_ids_to_remove = []
@@ -101,6 +153,10 @@ def handle_arxiv_search(query):
 def handle_interesting_papers(df):
     selected_df = dataframe_with_selections(df)
 
+    # 관심 논문은 백그라운드에서 미리 준비 (이미 준비된 논문은 건너뜀)
+    for abstract, arxiv_id in df[["Summary", "arxiv_id"]].values:
+        prefetch_paper(arxiv_id, abstract, st.session_state.get("index_options"))
+
     for i, (title, abstract, arxiv_id) in enumerate(
         selected_df[["Title", "Summary", "arxiv_id"]].values
     ):
@@ -117,26 +173,19 @@ def handle_interesting_papers(df):
             file_name = f"./data/paper_csv/{arxiv_id}_{target_lang}.json"
             translated_abstract = None
             if os.path.exists(file_name):
-                with open(file_name, "r", encoding="utf-8-sig") as f:
-                    translated_abstract = json.loads(f.read())["translated"]  # type: ignore
+                translated_abstract = translate_abstract(arxiv_id, abstract, target_lang)
                 st.expander("Translated Abstract").markdown(translated_abstract)
 
             else:
                 if trans_button:
-                    # load translated abstract
-                    translated_abstract = translate(abstract, target_lang)  # type: ignore
+                    # 번역 후 json으로 저장 (같은 번역이 동시에 요청되면 한 번만 실행)
+                    translated_abstract = translate_abstract(
+                        arxiv_id, abstract, target_lang  # type: ignore
+                    )
                     st.expander("Translated Abstract", expanded=True).markdown(
                         translated_abstract
                     )
 
-                    # save translated abstract as json
-                    translated_abstract = {
-                        "source": abstract,
-                        "translated": translated_abstract,
-                    }
-                    with open(file_name, "w", encoding="UTF-8-sig") as f:
-                        f.write(json.dumps(translated_abstract, ensure_ascii=False))
-
             if st.button("Search on Youtube", key=f"you_{i}", use_container_width=True):
                 data = {
                     "title": title,
@@ -161,6 +210,10 @@ if "axiv_id" not in st.session_state:
 if "paper_data" not in st.session_state:
     st.session_state.paper_data = None
 
+if "arxiv_search" not in st.session_state:
+    st.session_state.arxiv_search = None
+    st.session_state.arxiv_page = 0
+
 st.set_page_config(
     page_title="Review Paper Home",
     page_icon="🏠",
@@ -194,3 +247,6 @@ with st.container(border=True):
 with st.container(border=True):
     st.markdown("## Interesting Papers")
     handle_interesting_papers(df)
+
+if profile_enabled():
+    render_startup_profile(start_time, import_times)
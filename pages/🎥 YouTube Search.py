@@ -1,15 +1,22 @@
-import streamlit as st
-import os
-from src.youtube_search import search_youtube
-from src.utils import save_docs_to_jsonl, load_docs_from_jsonl
-from dotenv import load_dotenv
+import time
+
+start_time = time.perf_counter()
 
+import streamlit as st
+from src.startup_profile import (
+    profile_enabled,
+    profile_imports,
+    render_startup_profile,
+)
 
-from langchain.document_loaders.generic import GenericLoader
-from langchain.document_loaders.parsers.audio import OpenAIWhisperParser
-from langchain_community.document_loaders import YoutubeLoader
-from langchain_community.document_loaders import YoutubeAudioLoader
-from datetime import datetime, timezone
+with profile_imports() as import_times:
+    import os
+    from src.youtube_search import search_youtube
+    from src.utils import save_docs_to_jsonl, load_docs_from_jsonl
+    from src.single_flight import single_flight
+    from src.transcript import fetch_caption_segments, render_transcript
+    from dotenv import load_dotenv
+    from datetime import datetime, timezone
 
 
 def time_since(published_at):
@@ -51,6 +58,21 @@ def view_count(view_count):
         return f"{view_count // 1000000}M views"
 
 
+def fetch_transcript(script_path, load):
+    # 같은 영상의 스크립트를 여러 세션이 동시에 요청해도 한 번만 가져와 저장
+    def run():
+        docs = load()
+        save_docs_to_jsonl(docs, script_path)
+        return docs
+
+    return single_flight(
+        f"transcript:{script_path}",
+        run,
+        done=lambda: os.path.exists(script_path),
+        load=lambda: load_docs_from_jsonl(script_path),
+    )
+
+
 load_dotenv()
 
 
@@ -91,14 +113,19 @@ if query:
                 WHISPER_SCRIPT_DIR = YOUTUBE_AUDIO_SAVE_DIR + "/whisper_script.json"
                 YOUTUBE_SCRIPT_DIR = YOUTUBE_AUDIO_SAVE_DIR + "/script.json"
 
+                # 스크립트는 펼쳤을 때만 한 페이지씩 렌더링
                 if os.path.exists(WHISPER_SCRIPT_DIR):
-                    docs = load_docs_from_jsonl(WHISPER_SCRIPT_DIR)
-                    transript = "".join([doc.page_content for doc in docs])
-                    st.expander("Whisper transcipt", expanded=True).markdown(transript)
+                    render_transcript(
+                        lambda: load_docs_from_jsonl(WHISPER_SCRIPT_DIR),
+                        f"script_{i}",
+                        "Whisper transcript 보기",
+                    )
                 elif os.path.exists(YOUTUBE_SCRIPT_DIR):
-                    docs = load_docs_from_jsonl(YOUTUBE_SCRIPT_DIR)
-                    transript = "".join([doc.page_content for doc in docs])
-                    st.expander("Youtube transript", expanded=True).markdown(transript)
+                    render_transcript(
+                        lambda: load_docs_from_jsonl(YOUTUBE_SCRIPT_DIR),
+                        f"script_{i}",
+                        "Youtube transcript 보기",
+                    )
                 else:
                     col1, col2 = st.columns([1, 1])
 
@@ -106,6 +133,7 @@ if query:
                         transcript_type = st.selectbox(
                             "스크립트 가져오기 방식을 선택하세요",
                             ["선택하세요", "유튜브 자막", "Whisper 음성 인식"],
+                            index=1,  # 자막이 있으면 빠르고 비용이 없으므로 기본값
                             key=f"script_type_{i}",
                         )
 
@@ -128,13 +156,14 @@ if query:
                         if transcript_type == "유튜브 자막":
                             SCRIPT_PATH = YOUTUBE_SCRIPT_DIR
                             with st.spinner("유튜브 자막을 가져오는 중..."):
-                                loader = YoutubeLoader.from_youtube_url(video["url"])
-                                docs = loader.load()
-                                transript = "".join([doc.page_content for doc in docs])
-                                st.expander(
-                                    "Youtube transript", expanded=True
-                                ).markdown(transript)
-                                save_docs_to_jsonl(docs, SCRIPT_PATH)
+                                # 타임스탬프가 있는 자막 구간 단위로 저장
+                                docs = fetch_transcript(
+                                    SCRIPT_PATH,
+                                    lambda: fetch_caption_segments(video["url"]),
+                                )
+                                render_transcript(
+                                    lambda: docs, f"script_{i}", "Youtube transcript 보기"
+                                )
                                 st.success("유튜브 자막을 성공적으로 저장했습니다!")
 
                         elif transcript_type == "Whisper 음성 인식":
@@ -142,6 +171,16 @@ if query:
                             with st.spinner(
                                 "Whisper를 사용하여 음성을 텍스트로 변환하는 중... (시간이 다소 소요될 수 있습니다)"
                             ):
+                                from langchain.document_loaders.generic import (
+                                    GenericLoader,
+                                )
+                                from langchain.document_loaders.parsers.audio import (
+                                    OpenAIWhisperParser,
+                                )
+                                from langchain_community.document_loaders import (
+                                    YoutubeAudioLoader,
+                                )
+
                                 loader = GenericLoader(
                                     YoutubeAudioLoader(
                                         urls=[video["url"]],
@@ -151,14 +190,15 @@ if query:
                                         response_format="json", language=target_lang
                                     ),
                                 )
-                                docs = loader.load()
-                                transript = "".join([doc.page_content for doc in docs])
-                                st.expander(
-                                    "Whisper transript", expanded=True
-                                ).markdown(transript)
-                                save_docs_to_jsonl(docs, SCRIPT_PATH)
+                                docs = fetch_transcript(SCRIPT_PATH, loader.load)
+                                render_transcript(
+                                    lambda: docs, f"script_{i}", "Whisper transcript 보기"
+                                )
                                 st.success(
                                     "Whisper 음성 인식 결과를 성공적으로 저장했습니다!"
                                 )
                         else:
                             st.error("스크립트 가져오기 방식을 선택해주세요.")
+
+if profile_enabled():
+    render_startup_profile(start_time, import_times)
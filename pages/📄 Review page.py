@@ -1,27 +1,90 @@
+import time
+
+start_time = time.perf_counter()
+
 import os
 import streamlit as st
 from glob import glob
-from langchain.document_loaders import ArxivLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.embeddings.openai import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.retrievers import EnsembleRetriever
-from langchain_core.runnables import RunnablePassthrough
-from src.utils import load_docs_from_jsonl
-from langchain.chat_models.openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-import time
+from src.startup_profile import (
+    profile_enabled,
+    profile_imports,
+    render_startup_profile,
+)
+
+with profile_imports() as import_times:
+    from src.utils import current_user_id, load_docs_from_jsonl
+    from src.answer_cache import get_answer_cache, get_index_version
+    from src.context_packer import pack_context
+    from src.library_index import LibraryIndex, paper_db_path
+    from src.paper_loader import load_paper_docs
+    from src.prefetch import get_prefetcher
+    from src.review_store import ReviewConflictError, get_review_store
+    from src.transcript import (
+        chunk_by_time,
+        format_timestamp,
+        is_timestamped,
+        render_transcript,
+        timestamp_url,
+    )
+    from src.vector_index import (
+        DEFAULT_INDEX_OPTIONS,
+        FULL_DIMENSIONS,
+        PAPER_INDEX_TYPES,
+        get_text_splitter,
+        index_matches,
+        load_index_config,
+        load_or_build_vector_store,
+    )
+    from dotenv import load_dotenv
+
+# OpenAIEmbeddings/ChatOpenAI가 사용할 API 키를 불러옴
+load_dotenv()
+
+QA_PROMPT_TEMPLATE = """
+        You are an expert in summarizing and explaining complex information. Use the provided information from both academic papers and video reviews to answer the user's question comprehensively. Ensure that your answer is clear, concise, and based on the retrieved documents.
+        
+        IMPORTANT: You must respond in {language}.
+
+        Provided Information:
+        {context}
+
+        Question:
+        {question}
+
+        Answer (in {language}):
+        """
+
+LIBRARY_PROMPT_TEMPLATE = """
+        You are an expert research assistant. Each passage below comes from one of the user's saved papers and starts with the paper's arXiv ID in square brackets. Answer the user's question using only these passages, and cite the papers you rely on with their arXiv IDs, e.g. [2401.00001].
+
+        IMPORTANT: You must respond in {language}.
+
+        Provided Information:
+        {context}
+
+        Question:
+        {question}
+
+        Answer (in {language}):
+        """
 
 
 class ReviewPage:
+    # 패킹할 후보는 8개까지 검색하되, 절약량은 기존 프롬프트(retriever 기본값 k=4) 기준으로 계산
+    RETRIEVER_K = 8
+    BASELINE_K = 4
+    # 250자 청크 4개(기존 프롬프트)와 비슷한 크기. 후보 8개를 모두 넣지 않도록 제한
+    CONTEXT_TOKEN_BUDGET = 250
+
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=250,
-            chunk_overlap=50,
-            length_function=len,
-            is_separator_regex=False,
-        )
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+        self._text_splitter = None
+        self.library_index = LibraryIndex()
+        self.context_token_budget = self.CONTEXT_TOKEN_BUDGET
+        self.baseline_k = self.BASELINE_K
+        self.last_context_stats = None
+        # 세션에 저장해 Home의 백그라운드 prefetch도 같은 옵션으로 인덱스를 만들도록 함
+        if "index_options" not in st.session_state:
+            st.session_state.index_options = dict(DEFAULT_INDEX_OPTIONS)
 
         # 세션 상태 변수 초기화
         if "retriever" not in st.session_state:
@@ -30,35 +93,121 @@ class ReviewPage:
             st.session_state.paper_retriever = None
         if "youtube_retriever" not in st.session_state:
             st.session_state.youtube_retriever = None
+        if "youtube_db_path" not in st.session_state:
+            st.session_state.youtube_db_path = None
+
+    def reset_retrievers_for(self, arxiv_id):
+        # retriever는 논문별로 만들어지므로 다른 논문을 열면 이전 논문의 retriever를 버림
+        # (그대로 두면 다른 논문의 인덱스로 답한 결과가 이 논문의 답변 캐시에 저장됨)
+        if st.session_state.get("retriever_arxiv_id") == arxiv_id:
+            return
+        st.session_state.retriever = None
+        st.session_state.paper_retriever = None
+        st.session_state.youtube_retriever = None
+        st.session_state.youtube_db_path = None
+        st.session_state.retriever_arxiv_id = arxiv_id
+
+    @property
+    def text_splitter(self):
+        if self._text_splitter is None:
+            self._text_splitter = get_text_splitter()
+        return self._text_splitter
+
+    @property
+    def answer_cache(self):
+        return get_answer_cache()
+
+    def load_markdown(self, arxiv_id, title):
+        store = get_review_store()
+        md, version = store.load(arxiv_id)
+        if version > 0:
+            return md, version
+
+        # 제목으로 저장하던 기존 리뷰가 있으면 arxiv_id 기반 저장소로 옮김
+        legacy_path = f"./data/review_markdown/{title}.md"
+        if not os.path.exists(legacy_path):
+            return f"## {title} Review\n\n", 0
+        with open(legacy_path, "r") as f:
+            md = f.read()
+        try:
+            return md, store.save(arxiv_id, md, 0)
+        except ReviewConflictError:
+            return store.load(arxiv_id)
+
+    def init_review_state(self, arxiv_id, title):
+        # 처음 열 때만 저장소에서 읽고, 이후 rerun에서는 session_state의 내용을 사용
+        text_key = f"review_md_{arxiv_id}"
+        if text_key not in st.session_state:
+            md, version = self.load_markdown(arxiv_id, title)
+            st.session_state[text_key] = md
+            st.session_state[f"review_base_{arxiv_id}"] = version
+        return text_key
+
+    def on_review_change(self, arxiv_id, session_id):
+        get_review_store().schedule_save(
+            arxiv_id,
+            session_id,
+            st.session_state[f"review_md_{arxiv_id}"],
+            st.session_state[f"review_base_{arxiv_id}"],
+        )
 
-    def load_markdown(self, title):
-        if os.path.exists(f"./data/review_markdown/{title}.md"):
-            with open(f"./data/review_markdown/{title}.md", "r") as f:
-                return f.read()
-        else:
-            return f"## {title} Review\n\n"
-
-    def save_markdown(self, md, title):
-        # 디렉토리가 없으면 생성
-        os.makedirs("./data/review_markdown", exist_ok=True)
-        with open(f"./data/review_markdown/{title}.md", "w") as f:
-            f.write(md)
-
-    def create_vector_db(self, db_file_name, docs):
-        if os.path.exists(db_file_name):
-            db = FAISS.load_local(
-                db_file_name,
-                self.embeddings,
-                allow_dangerous_deserialization=True,
+    def overwrite_review(self, arxiv_id, session_id, current_version):
+        store = get_review_store()
+        store.clear_autosave(arxiv_id, session_id)
+        st.session_state[f"review_base_{arxiv_id}"] = current_version
+        self.on_review_change(arxiv_id, session_id)
+        store.flush(arxiv_id, session_id)
+
+    def reload_review(self, arxiv_id, session_id, current_text, current_version):
+        get_review_store().clear_autosave(arxiv_id, session_id)
+        st.session_state[f"review_md_{arxiv_id}"] = current_text
+        st.session_state[f"review_base_{arxiv_id}"] = current_version
+
+    def show_review_status(self, arxiv_id, session_id):
+        state = get_review_store().autosave_state(arxiv_id, session_id)
+        if state is None:
+            return
+        if state["status"] == "saved":
+            st.session_state[f"review_base_{arxiv_id}"] = state["version"]
+            st.caption(f"💾 저장됨 (버전 {state['version']})")
+        elif state["status"] == "pending":
+            st.caption("✏️ 자동 저장 대기 중...")
+        elif state["status"] == "conflict":
+            error = state["error"]
+            st.warning(
+                f"다른 곳에서 리뷰가 먼저 수정되었습니다 (버전 {error.current_version}). "
+                "작성 중인 내용은 저장되지 않은 상태로 유지됩니다."
             )
-        else:
-            docs = self.text_splitter.split_documents(docs)
-            db = FAISS.from_documents(docs, self.embeddings)
-            db.save_local(db_file_name)
+            st.expander("저장된 최신 버전 보기").markdown(error.current_text)
+            col_conflict = st.columns([1, 1])
+            with col_conflict[0]:
+                st.button(
+                    "내 내용으로 덮어쓰기",
+                    on_click=self.overwrite_review,
+                    args=(arxiv_id, session_id, error.current_version),
+                    use_container_width=True,
+                )
+            with col_conflict[1]:
+                st.button(
+                    "최신 버전 불러오기",
+                    on_click=self.reload_review,
+                    args=(arxiv_id, session_id, error.current_text, error.current_version),
+                    use_container_width=True,
+                )
+
+    def create_vector_db(self, db_file_name, load_docs, split=True, rebuild=False):
+        # 같은 인덱스를 여러 세션이 동시에 만들면 한 번만 생성하고 나머지는 결과를 공유
+        db = load_or_build_vector_store(
+            db_file_name,
+            load_docs,
+            split=split,
+            rebuild=rebuild,
+            **st.session_state.index_options,
+        )
 
-        return db.as_retriever()
+        return db.as_retriever(search_kwargs={"k": self.RETRIEVER_K})
 
-    def create_arxiv_vector_db(self, arxiv_id):
+    def create_arxiv_vector_db(self, arxiv_id, rebuild=False):
         progress_bar = st.progress(0)
         status_text = st.empty()
 
@@ -66,12 +215,6 @@ class ReviewPage:
             status_text.text("논문을 불러오는 중...")
             progress_bar.progress(10)
 
-            arxiv_loader = ArxivLoader(arxiv_id)
-            docs = arxiv_loader.load()
-
-            status_text.text("논문을 분석하는 중...")
-            progress_bar.progress(30)
-
             # 디렉토리가 없으면 생성
             os.makedirs("./data/vector_db", exist_ok=True)
             db_file_name = f"./data/vector_db/{arxiv_id}_paper_pdf"
@@ -79,7 +222,14 @@ class ReviewPage:
             status_text.text("벡터 데이터베이스를 생성하는 중...")
             progress_bar.progress(60)
 
-            retriever = self.create_vector_db(db_file_name, docs)
+            # 인덱스가 이미 있으면 PDF를 다시 받지 않음
+            retriever = self.create_vector_db(
+                db_file_name, lambda: load_paper_docs(arxiv_id), rebuild=rebuild
+            )
+
+            # 라이브러리 전역 인덱스에도 반영
+            if arxiv_id in st.session_state.get("interest_paper_list", []):
+                self.library_index.add_paper(arxiv_id)
 
             status_text.text("완료되었습니다!")
             progress_bar.progress(100)
@@ -95,13 +245,15 @@ class ReviewPage:
             st.error(f"RAG 생성 중 오류가 발생했습니다: {str(e)}")
             return None
 
-    def create_youtube_vector_db(self, db_file_name_youtube, docs, video_name):
+    def create_youtube_vector_db(self, db_file_name_youtube, trans_path, video_name):
         progress_bar = st.progress(0)
         status_text = st.empty()
 
         try:
             status_text.text("YouTube 스크립트를 분석하는 중...")
             progress_bar.progress(30)
+            # 스크립트는 RAG를 만들 때만 읽음
+            docs = load_docs_from_jsonl(trans_path)
 
             # 디렉토리가 없으면 생성
             os.makedirs(os.path.dirname(db_file_name_youtube), exist_ok=True)
@@ -109,7 +261,15 @@ class ReviewPage:
             status_text.text("벡터 데이터베이스를 생성하는 중...")
             progress_bar.progress(60)
 
-            youtube_retriever = self.create_vector_db(db_file_name_youtube, docs)
+            # 타임스탬프가 있는 자막은 시간 구간 단위로, 그 외에는 글자 수로 나눔
+            if is_timestamped(docs):
+                chunks = chunk_by_time(docs)
+            else:
+                chunks = self.text_splitter.split_documents(docs)
+
+            youtube_retriever = self.create_vector_db(
+                db_file_name_youtube, lambda: chunks, split=False
+            )
 
             status_text.text("완료되었습니다!")
             progress_bar.progress(100)
@@ -119,6 +279,7 @@ class ReviewPage:
             status_text.empty()
 
             st.session_state.youtube_retriever = youtube_retriever
+            st.session_state.youtube_db_path = db_file_name_youtube
             st.success(f"{video_name} 스크립트의 RAG가 생성되었습니다.")
             st.experimental_rerun()  # 페이지를 새로고침하여 버튼 상태 업데이트
 
@@ -129,15 +290,113 @@ class ReviewPage:
             st.error(f"YouTube RAG 생성 중 오류가 발생했습니다: {str(e)}")
             return None
 
-    def answer_question(self, question):
+    def get_active_index_version(self, arxiv_id):
+        db_paths = []
+        if st.session_state.paper_retriever is not None:
+            db_paths.append(f"./data/vector_db/{arxiv_id}_paper_pdf")
+        if st.session_state.youtube_retriever is not None:
+            db_paths.append(st.session_state.youtube_db_path)
+        return get_index_version(db_paths)
+
+    def answer_question(self, question, arxiv_id, library_mode=False):
         language = st.session_state.language
-        result = self.rag_chain.invoke(question)
+        if library_mode:
+            arxiv_id = "library"
+            index_version = get_index_version(self.library_index.shard_paths())
+        else:
+            index_version = self.get_active_index_version(arxiv_id)
+
+        start = time.perf_counter()
+        answer, embedding = self.answer_cache.lookup(
+            arxiv_id, index_version, language, question
+        )
+        cached = answer is not None
+        self.last_context_stats = None
+        if not cached:
+            answer = self.rag_chain.invoke(question).content
+            self.answer_cache.store(
+                arxiv_id, index_version, language, question, answer, embedding
+            )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
         with st.container(border=True):
             st.markdown(f"**질문**: {question}")
-            st.markdown(f"**답변 ({language})**: {result.content}")
+            st.markdown(f"**답변 ({language})**: {answer}")
+            if cached:
+                st.caption(f"⚡ 캐시된 답변입니다 ({elapsed_ms:.0f}ms)")
+            elif self.last_context_stats is not None:
+                stats = self.last_context_stats
+                st.caption(
+                    f"컨텍스트: {stats['retrieved_chunks']}개 청크 → {stats['packed_spans']}개 구간, "
+                    f"{stats['packed_tokens']} 토큰 (기존 프롬프트 {stats['naive_tokens']} 토큰 대비 "
+                    f"절약 {stats['saved_tokens']} 토큰)"
+                )
+                if library_mode:
+                    self.show_citations(stats["spans"])
+                else:
+                    self.show_video_links(stats["spans"])
+
+    def show_video_links(self, spans):
+        # 타임스탬프가 있는 자막 구간이 검색되면 해당 시점으로 바로 이동하는 링크 표시
+        links = [
+            f"[▶ {format_timestamp(span['metadata']['start'])}]"
+            f"({timestamp_url(span['metadata']['source'], span['metadata']['start'])})"
+            for span in spans
+            if "start" in span["metadata"] and span["metadata"].get("source")
+        ]
+        if links:
+            st.markdown("**참고 영상 구간**: " + " · ".join(links))
+
+    def show_citations(self, spans):
+        cited = {}
+        for span in spans:
+            paper_id = span["metadata"].get("arxiv_id")
+            if paper_id:
+                cited.setdefault(paper_id, span["metadata"].get("Title", paper_id))
+        if cited:
+            st.markdown("**참고 논문**")
+            for paper_id, title in cited.items():
+                st.markdown(f"- [{paper_id}] [{title}](https://arxiv.org/abs/{paper_id})")
 
     def format_docs(self, docs):
-        return "\n\n".join(doc.page_content for doc in docs)
+        # 체인 내부 스레드에서 호출되므로 session_state 대신 인스턴스에 기록
+        context, self.last_context_stats = pack_context(
+            docs, token_budget=self.context_token_budget, baseline_k=self.baseline_k
+        )
+        return context
+
+    def format_library_docs(self, docs):
+        context, self.last_context_stats = pack_context(
+            docs, token_budget=self.context_token_budget, baseline_k=self.baseline_k
+        )
+        # 각 구간 앞에 출처 논문을 붙여 답변에서 인용할 수 있도록 함
+        return "\n\n".join(
+            f"[{span['metadata'].get('arxiv_id')}] {span['metadata'].get('Title', '')}\n{span['text']}"
+            for span in self.last_context_stats["spans"]
+        )
+
+    def build_rag_chain(self, retriever, format_docs, prompt_template, language_code):
+        from langchain.chat_models.openai import ChatOpenAI
+        from langchain.prompts import PromptTemplate
+        from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+
+        if not hasattr(retriever, "invoke"):
+            retriever = RunnableLambda(retriever)
+
+        llm = ChatOpenAI(model="gpt-4o-mini")
+        prompt = PromptTemplate(
+            template=prompt_template,
+            input_variables=["context", "question", "language"],
+        )
+        return (
+            {
+                "context": retriever | format_docs,
+                "question": RunnablePassthrough(),
+                "language": lambda _: language_code,
+            }
+            | prompt
+            | llm
+        )
 
     def setup(self):
         st.set_page_config(
@@ -153,6 +412,7 @@ class ReviewPage:
         paper_title = df["Title"].values[0]
         abstract = df["Summary"].values[0]
         arxiv_id = df["arxiv_id"].values[0]
+        self.reset_retrievers_for(arxiv_id)
 
         # 언어 선택 (기본값은 한국어)
         if "language" not in st.session_state:
@@ -173,6 +433,11 @@ class ReviewPage:
                 )
                 st.session_state.language = selected_language
 
+                search_scope = st.radio(
+                    "검색 범위", ["현재 논문", "전체 라이브러리"], horizontal=True
+                )
+                library_mode = search_scope == "전체 라이브러리"
+
             with col_settings[1]:
                 # 언어 코드 매핑
                 language_code_map = {
@@ -183,29 +448,49 @@ class ReviewPage:
                 }
                 language_code = language_code_map[selected_language]
 
-        # 1. 질문 기능을 상단에 배치
-        llm = ChatOpenAI(model="gpt-4o-mini")
-        qa_prompt_template = """
-        You are an expert in summarizing and explaining complex information. Use the provided information from both academic papers and video reviews to answer the user's question comprehensively. Ensure that your answer is clear, concise, and based on the retrieved documents.
-        
-        IMPORTANT: You must respond in {language}.
-
-        Provided Information:
-        {context}
-
-        Question:
-        {question}
+                self.context_token_budget = st.number_input(
+                    "컨텍스트 토큰 예산",
+                    min_value=100,
+                    max_value=8000,
+                    value=self.CONTEXT_TOKEN_BUDGET,
+                    step=50,
+                )
 
-        Answer (in {language}):
-        """
-        qa_prompt = PromptTemplate(
-            template=qa_prompt_template,
-            input_variables=["context", "question", "language"],
-        )
+            # 새로 만들거나 다시 만드는 인덱스에 적용됨
+            with st.expander("인덱스 옵션 (새로 생성하거나 다시 생성하는 RAG에 적용)"):
+                options = st.session_state.index_options
+                dimension_choices = [FULL_DIMENSIONS, 1024, 512, 256]
+                col_index = st.columns([1, 1])
+                with col_index[0]:
+                    dimensions = st.selectbox(
+                        "임베딩 차원",
+                        dimension_choices,
+                        index=dimension_choices.index(
+                            options["dimensions"] or FULL_DIMENSIONS
+                        ),
+                    )
+                with col_index[1]:
+                    index_type = st.selectbox(
+                        "인덱스 타입",
+                        PAPER_INDEX_TYPES,
+                        index=PAPER_INDEX_TYPES.index(options["index_type"]),
+                    )
+                st.session_state.index_options = {
+                    "dimensions": None if dimensions == FULL_DIMENSIONS else dimensions,
+                    "index_type": index_type,
+                }
 
+        # 1. 질문 기능을 상단에 배치
         # RAG 버튼을 상단에 배치
         col_rag1, col_rag2 = st.columns([1, 1])
 
+        # 백그라운드 prefetch로 인덱스가 이미 준비되어 있으면 바로 불러옴
+        paper_db = paper_db_path(arxiv_id)
+        if st.session_state.paper_retriever is None and os.path.exists(paper_db):
+            st.session_state.paper_retriever = self.create_vector_db(
+                paper_db, lambda: load_paper_docs(arxiv_id)
+            )
+
         # Paper RAG 버튼은 이미 생성된 경우 표시하지 않음
         paper_rag_exists = (
             "paper_retriever" in st.session_state
@@ -214,6 +499,8 @@ class ReviewPage:
 
         if not paper_rag_exists:
             with col_rag1:
+                if get_prefetcher().status(arxiv_id) in ("queued", "running"):
+                    st.info("백그라운드에서 Paper RAG를 준비하고 있습니다.")
                 if st.button("Paper RAG 생성", use_container_width=True):
                     with st.spinner("RAG를 생성하는 중..."):
                         retriever = self.create_arxiv_vector_db(arxiv_id)
@@ -224,6 +511,26 @@ class ReviewPage:
         else:
             with col_rag1:
                 st.success("Paper RAG가 이미 생성되었습니다.")
+            # 백그라운드 prefetch 등으로 다른 옵션의 인덱스가 만들어져 있으면 다시 생성할 수 있음
+            if os.path.exists(paper_db) and not index_matches(
+                paper_db, **st.session_state.index_options
+            ):
+                with col_rag2:
+                    config = load_index_config(paper_db)
+                    st.caption(
+                        f"현재 인덱스: {config['dimensions'] or FULL_DIMENSIONS}차원, "
+                        f"{config['index_type']}"
+                    )
+                    if st.button(
+                        "인덱스 옵션으로 Paper RAG 다시 생성", use_container_width=True
+                    ):
+                        with st.spinner("RAG를 다시 생성하는 중..."):
+                            retriever = self.create_arxiv_vector_db(
+                                arxiv_id, rebuild=True
+                            )
+                            if retriever:
+                                st.session_state.paper_retriever = retriever
+                                st.experimental_rerun()
 
         # RAG 상태 표시
         if (
@@ -232,6 +539,8 @@ class ReviewPage:
             and st.session_state.paper_retriever is not None
             and st.session_state.youtube_retriever is not None
         ):
+            from langchain.retrievers import EnsembleRetriever
+
             retriever = EnsembleRetriever(
                 retrievers=[
                     st.session_state.paper_retriever,
@@ -240,6 +549,8 @@ class ReviewPage:
                 weights=[0.6, 0.4],
             )
             st.session_state.retriever = retriever
+            # 기존에는 두 retriever가 각각 k=4개씩 가져왔음
+            self.baseline_k = 2 * self.BASELINE_K
             st.success("Paper retriever와 Youtube retriever를 앙상블하여 사용합니다.")
         elif (
             "paper_retriever" in st.session_state
@@ -257,23 +568,55 @@ class ReviewPage:
             st.session_state.retriever = None
             st.warning("아직 활성화된 retriever가 없습니다. RAG를 생성해주세요.")
 
-        if st.session_state.retriever is not None:
+        if library_mode:
             try:
-                self.rag_chain = (
-                    {
-                        "context": st.session_state.retriever | self.format_docs,
-                        "question": RunnablePassthrough(),
-                        "language": lambda _: language_code,
-                    }
-                    | qa_prompt
-                    | llm
+                with st.spinner("라이브러리 인덱스를 갱신하는 중..."):
+                    self.library_index.sync(
+                        st.session_state.get("interest_paper_list", [])
+                    )
+                manifest = self.library_index.load_manifest()
+                st.info(
+                    f"전체 라이브러리 {len(manifest['papers'])}편의 논문에서 검색합니다. "
+                    "(Paper RAG를 생성한 관심 논문만 포함됩니다)"
                 )
+                if manifest["excluded"]:
+                    # 라이브러리보다 작은 차원으로 만든 논문 인덱스는 다시 임베딩하지 않고 제외
+                    with st.expander(
+                        f"라이브러리에서 제외된 논문 {len(manifest['excluded'])}편"
+                    ):
+                        for paper_id, excluded in manifest["excluded"].items():
+                            st.markdown(f"- [{paper_id}] {excluded['reason']}")
+                        st.caption(
+                            "'인덱스 옵션'에서 라이브러리와 같거나 더 큰 임베딩 차원을 고른 뒤 "
+                            "해당 논문 페이지에서 'Paper RAG 다시 생성'을 누르면 포함됩니다."
+                        )
 
+                st.markdown("## 라이브러리에 질문하기")
+                q_ = st.chat_input("저장한 논문 전체에 대해 질문해보세요:")
+                if q_:
+                    self.rag_chain = self.build_rag_chain(
+                        lambda q: self.library_index.search(q, k=self.RETRIEVER_K),
+                        self.format_library_docs,
+                        LIBRARY_PROMPT_TEMPLATE,
+                        language_code,
+                    )
+                    with st.spinner(f"{selected_language}로 답변을 생성하는 중..."):
+                        self.answer_question(q_, arxiv_id, library_mode=True)
+            except Exception as e:
+                st.error(f"라이브러리 검색 중 오류가 발생했습니다: {str(e)}")
+        elif st.session_state.retriever is not None:
+            try:
                 st.markdown("## 질문하기")
                 q_ = st.chat_input("논문에 대해 질문해보세요:")
                 if q_:
+                    self.rag_chain = self.build_rag_chain(
+                        st.session_state.retriever,
+                        self.format_docs,
+                        QA_PROMPT_TEMPLATE,
+                        language_code,
+                    )
                     with st.spinner(f"{selected_language}로 답변을 생성하는 중..."):
-                        self.answer_question(q_)
+                        self.answer_question(q_, arxiv_id)
             except Exception as e:
                 st.error(f"RAG 체인 생성 중 오류가 발생했습니다: {str(e)}")
                 st.session_state.retriever = None
@@ -282,13 +625,23 @@ class ReviewPage:
         st.markdown("## 리뷰 작성")
         col_1, col_2 = st.columns([1, 1], gap="large")
 
+        session_id = current_user_id()
+        text_key = self.init_review_state(arxiv_id, paper_title)
+
         with col_1:
-            md = self.load_markdown(paper_title)
-            md = st.text_area("Review를 위한 Markdown을 입력하세요: ", md, height=500)
+            # 입력이 바뀌면 잠시 뒤 자동 저장 (변경된 줄만 delta로 기록)
+            md = st.text_area(
+                "Review를 위한 Markdown을 입력하세요: ",
+                height=500,
+                key=text_key,
+                on_change=self.on_review_change,
+                args=(arxiv_id, session_id),
+            )
 
             if st.button("Markdown 저장"):
-                self.save_markdown(md, paper_title)
-                st.success("Markdown이 저장되었습니다.")
+                self.on_review_change(arxiv_id, session_id)
+                get_review_store().flush(arxiv_id, session_id)
+            self.show_review_status(arxiv_id, session_id)
 
         with col_2:
             st.write(md)
@@ -303,10 +656,12 @@ class ReviewPage:
             with st.container(border=True):
                 for i, trans_path in enumerate(youtube_trans_list):
                     try:
-                        docs = load_docs_from_jsonl(trans_path)
-                        trans = "".join([doc.page_content for doc in docs])
                         video_name = trans_path.split("/")[-2]
-                        st.expander(video_name, expanded=False).markdown(trans)
+                        render_transcript(
+                            lambda path=trans_path: load_docs_from_jsonl(path),
+                            f"review_script_{i}",
+                            video_name,
+                        )
 
                         # 이미 YouTube RAG가 생성되었는지 확인
                         db_file_name_youtube = (
@@ -318,13 +673,11 @@ class ReviewPage:
                             and os.path.exists(db_file_name_youtube)
                         )
 
-                        docs = self.text_splitter.split_documents(docs)
-
                         if not youtube_rag_exists:
                             st.button(
                                 "YouTube RAG 생성",
                                 on_click=self.create_youtube_vector_db,
-                                args=(db_file_name_youtube, docs, video_name),
+                                args=(db_file_name_youtube, trans_path, video_name),
                                 key=f"youtube_rag_{i}",
                             )
                         else:
@@ -336,3 +689,6 @@ class ReviewPage:
 if __name__ == "__main__":
     page = ReviewPage()
     page.setup()
+
+    if profile_enabled():
+        render_startup_profile(start_time, import_times)
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+from src.single_flight import file_lock
+
+ANSWER_CACHE_DIR = "./data/answer_cache"
+
+
+def normalize_question(question):
+    # 대소문자, 공백, 문장부호 차이는 같은 질문으로 취급
+    question = question.strip().lower()
+    question = re.sub(r"[^\w\s]", " ", question)
+    return re.sub(r"\s+", " ", question).strip()
+
+
+def get_index_version(db_paths):
+    # 인덱스 파일의 크기와 수정 시간으로 버전을 만들어 인덱스가 바뀌면 캐시가 무효화되도록 함
+    digest = hashlib.sha1()
+    for db_path in sorted(p for p in db_paths if p):
+        digest.update(db_path.encode("utf-8"))
+        if not os.path.isdir(db_path):
+            continue
+        for file_name in sorted(os.listdir(db_path)):
+            stat = os.stat(os.path.join(db_path, file_name))
+            digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+class AnswerCache:
+    """(논문, 인덱스 버전, 언어)별 답변 캐시
+
+    답변은 {key}.json, 질문 임베딩은 같은 순서로 {key}.npy(float16)에 따로 저장하고
+    프로세스 안에서는 파일이 바뀌지 않는 한 메모리에 올려둔 내용을 사용
+    """
+
+    def __init__(
+        self,
+        embeddings=None,
+        cache_dir=ANSWER_CACHE_DIR,
+        similarity_threshold=0.92,
+        ttl_seconds=7 * 24 * 3600,
+        max_entries=200,
+    ):
+        self.embeddings = embeddings
+        self.cache_dir = cache_dir
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._memory = {}
+
+    def _prefix(self, arxiv_id, language):
+        return os.path.join(self.cache_dir, f"{arxiv_id}_{language}_")
+
+    def _paths(self, arxiv_id, index_version, language):
+        # 인덱스 버전마다 파일을 따로 두어 검색 범위가 다른 세션끼리 캐시를 지우지 않도록 함
+        base = f"{self._prefix(arxiv_id, language)}{index_version}"
+        return f"{base}.json", f"{base}.npy"
+
+    def _stamp(self, json_path):
+        if not os.path.exists(json_path):
+            return None
+        stat = os.stat(json_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self, json_path, npy_path):
+        stamp = self._stamp(json_path)
+        state = {"stamp": stamp, "entries": [], "matrix": None}
+        if stamp is None:
+            return state
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return state
+
+        state["entries"] = data.get("entries", [])
+        try:
+            matrix = np.load(npy_path).astype("float32")
+        except (OSError, ValueError):
+            matrix = None
+        # 두 파일이 서로 다른 시점에 저장된 경우 임베딩은 사용하지 않음 (정확히 같은 질문만 조회)
+        if (
+            matrix is not None
+            and matrix.ndim == 2
+            and matrix.shape[1] > 0
+            and len(matrix) == len(state["entries"])
+        ):
+            state["matrix"] = _normalize_rows(matrix)
+        return state
+
+    def _state(self, arxiv_id, index_version, language):
+        # self._lock을 잡은 상태에서 호출
+        key = (arxiv_id, index_version, language)
+        json_path, npy_path = self._paths(arxiv_id, index_version, language)
+        state = self._memory.get(key)
+        if state is None or state["stamp"] != self._stamp(json_path):
+            state = self._read(json_path, npy_path)
+            self._memory[key] = state
+        return state
+
+    def _live(self, state):
+        now = time.time()
+        return [
+            i
+            for i, entry in enumerate(state["entries"])
+            if now - entry["created_at"] < self.ttl_seconds
+        ]
+
+    def _write(self, arxiv_id, index_version, language, entries, vectors):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        json_path, npy_path = self._paths(arxiv_id, index_version, language)
+
+        # 임베딩을 먼저 쓰고 답변 파일을 나중에 교체 (답변 파일의 변경 시간이 캐시 버전)
+        # 아직 임베딩이 하나도 없으면 폭이 0인 행렬을 남기지 않고 파일을 지움
+        if vectors is None:
+            if os.path.exists(npy_path):
+                os.remove(npy_path)
+        else:
+            tmp_path = f"{npy_path}.tmp-{os.getpid()}.npy"
+            np.save(tmp_path, vectors.astype("float16"))
+            os.replace(tmp_path, npy_path)
+
+        tmp_path = f"{json_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"index_version": index_version, "entries": entries},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, json_path)
+
+    def _prune(self, arxiv_id, language, keep_path):
+        # 다른 인덱스 버전의 캐시는 TTL 동안 쓰이지 않았으면 삭제
+        prefix = self._prefix(arxiv_id, language)
+        now = time.time()
+        for file_name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, file_name)
+            if not path.startswith(prefix) or path == keep_path:
+                continue
+            if not path.endswith(".json"):
+                continue
+            if now - os.path.getmtime(path) >= self.ttl_seconds:
+                for stale in (path, path[: -len(".json")] + ".npy"):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+
+    def _embed(self, question):
+        if self.embeddings is None:
+            return None
+        try:
+            return self.embeddings.embed_query(question)
+        except Exception:
+            return None
+
+    def lookup(self, arxiv_id, index_version, language, question):
+        """캐시된 답변이 있으면 (answer, embedding)을, 없으면 (None, embedding)을 반환"""
+        normalized = normalize_question(question)
+        with self._lock:
+            state = self._state(arxiv_id, index_version, language)
+            live = self._live(state)
+            for i in live:
+                entry = state["entries"][i]
+                if entry["question"] == normalized:
+                    # 사용 시각은 메모리에만 기록하고 다음 저장 때 함께 씀
+                    entry["last_access"] = time.time()
+                    return entry["answer"], None
+            matrix = state["matrix"]
+
+        if not live or matrix is None:
+            return None, None
+
+        embedding = self._embed(question)
+        if embedding is None:
+            return None, None
+
+        query = np.asarray(embedding, dtype="float32")
+        norm = np.linalg.norm(query)
+        if norm == 0 or query.shape[0] != matrix.shape[1]:
+            return None, embedding
+        scores = matrix[live] @ (query / norm)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None, embedding
+
+        with self._lock:
+            entry = state["entries"][live[best]]
+            entry["last_access"] = time.time()
+            return entry["answer"], embedding
+
+    def store(self, arxiv_id, index_version, language, question, answer, embedding=None):
+        normalized = normalize_question(question)
+        if embedding is None:
+            embedding = self._embed(question)
+
+        json_path, _ = self._paths(arxiv_id, index_version, language)
+        # 여러 프로세스가 같은 파일을 읽고-수정-쓰기 하므로 파일 락으로 보호
+        with file_lock(json_path), self._lock:
+            state = self._state(arxiv_id, index_version, language)
+            matrix = state["matrix"]
+            # 저장된 임베딩이 없으면 이번 임베딩의 차원을 사용
+            if matrix is not None:
+                dimensions = matrix.shape[1]
+            elif embedding is not None:
+                dimensions = len(embedding)
+            else:
+                dimensions = None
+
+            rows = []
+            for i in self._live(state):
+                entry = state["entries"][i]
+                if entry["question"] == normalized:
+                    continue
+                rows.append((entry, matrix[i] if matrix is not None else None))
+
+            now = time.time()
+            vector = None
+            if embedding is not None and len(embedding) == dimensions:
+                vector = np.asarray(embedding, dtype="float32")
+            rows.append(
+                (
+                    {
+                        "question": normalized,
+                        "answer": answer,
+                        "created_at": now,
+                        "last_access": now,
+                    },
+                    vector,
+                )
+            )
+
+            # LRU: 가장 오래 사용되지 않은 항목부터 제거
+            rows.sort(key=lambda row: row[0]["last_access"], reverse=True)
+            rows = rows[: self.max_entries]
+
+            entries = [entry for entry, _ in rows]
+            vectors = None
+            if dimensions:
+                # 임베딩이 없는 항목은 0벡터로 두어 유사도 검색에서 걸리지 않게 함
+                vectors = np.zeros((len(rows), dimensions), dtype="float32")
+                for i, (_, row_vector) in enumerate(rows):
+                    if row_vector is not None:
+                        vectors[i] = row_vector
+            self._write(arxiv_id, index_version, language, entries, vectors)
+            self._prune(arxiv_id, language, json_path)
+
+            self._memory[(arxiv_id, index_version, language)] = {
+                "stamp": self._stamp(json_path),
+                "entries": entries,
+                "matrix": _normalize_rows(vectors) if vectors is not None else None,
+            }
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """모든 세션이 공유하는 답변 캐시 (메모리 캐시와 잠금을 함께 쓰기 위해 하나만 생성)"""
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            from src.vector_index import get_embeddings
+
+            _answer_cache = AnswerCache(get_embeddings())
+    return _answer_cache
@@ -1,21 +1,103 @@
 import arxiv
 import streamlit as st
 import pandas as pd
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.prefetch import prefetch_paper
 
 # Construct the default API client.
 client = arxiv.Client()
 
+SORT_OPTIONS = {
+    "관련도": arxiv.SortCriterion.Relevance,
+    "최신 제출순": arxiv.SortCriterion.SubmittedDate,
+    "최근 수정순": arxiv.SortCriterion.LastUpdatedDate,
+}
 
-def search_arxiv(query):
+# arxiv.Client는 요청 간 지연(delay_seconds)을 스스로 지키지만 스레드 안전하지 않으므로
+# 화면 요청과 백그라운드 prefetch가 하나의 락으로 클라이언트를 공유
+_client_lock = threading.Lock()
+# 페이지 캐시와 prefetch 목록은 여러 세션의 스크립트 스레드와 prefetch 워커가 함께 사용
+_cache_lock = threading.Lock()
+_page_cache = {}
+_prefetch_executor = ThreadPoolExecutor(max_workers=1)
+_prefetch_futures = {}
+MAX_CACHED_PAGES = 50
+# 최신순 정렬 결과가 오래 남지 않도록 캐시된 페이지는 잠시만 사용
+PAGE_CACHE_TTL_SECONDS = 5 * 60
+
+
+def _page_key(query, page, page_size, sort_by):
+    return (query, page, page_size, sort_by)
+
+
+def _fetch_page(query, page, page_size, sort_by):
+    # 한 페이지는 HTTP 응답 하나로 오므로 락 안에서 목록으로 받고, 카드를 그리는 동안은 락을 잡지 않음
     search = arxiv.Search(
         query=query,
-        max_results=10,
-        sort_by=arxiv.SortCriterion.Relevance,
+        max_results=(page + 1) * page_size,
+        sort_by=SORT_OPTIONS[sort_by],
     )
 
-    results = client.results(search)
-
-    return list(results)
+    with _client_lock:
+        client.page_size = page_size
+        results = list(client.results(search, offset=page * page_size))
+
+    with _cache_lock:
+        _page_cache[_page_key(query, page, page_size, sort_by)] = (time.time(), results)
+        while len(_page_cache) > MAX_CACHED_PAGES:
+            _page_cache.pop(next(iter(_page_cache)))
+    return results
+
+
+def _cached_page(key):
+    # _cache_lock을 잡은 상태에서 호출
+    cached = _page_cache.get(key)
+    if cached is None:
+        return None
+    if time.time() - cached[0] > PAGE_CACHE_TTL_SECONDS:
+        _page_cache.pop(key, None)
+        return None
+    return cached[1]
+
+
+def _forget_prefetch(key):
+    with _cache_lock:
+        _prefetch_futures.pop(key, None)
+
+
+def prefetch_arxiv_page(query, page, page_size=10, sort_by="관련도"):
+    key = _page_key(query, page, page_size, sort_by)
+    with _cache_lock:
+        if _cached_page(key) is not None or key in _prefetch_futures:
+            return
+        future = _prefetch_executor.submit(
+            _fetch_page, query, page, page_size, sort_by
+        )
+        _prefetch_futures[key] = future
+    future.add_done_callback(lambda _: _forget_prefetch(key))
+
+
+def search_arxiv(query, page=0, page_size=10, sort_by="관련도"):
+    """검색 결과 한 페이지를 yield하는 generator
+
+    최근에 받아둔(또는 prefetch 중인) 페이지는 캐시에서 반환
+    """
+    key = _page_key(query, page, page_size, sort_by)
+    with _cache_lock:
+        future = _prefetch_futures.get(key)
+    if future is not None:
+        try:
+            future.result()
+        except Exception:
+            # prefetch가 실패하면 직접 다시 요청
+            pass
+    with _cache_lock:
+        results = _cached_page(key)
+    if results is None:
+        results = _fetch_page(query, page, page_size, sort_by)
+    yield from results
 
 
 def split_id_from_url(url):
@@ -51,8 +133,13 @@ def on_change_interest_paper_list(arxiv_id):
         df = pd.read_csv(f"./data/paper_csv/paper.csv")
         df = df[df["arxiv_id"] != arxiv_id]
         df.to_csv(f"./data/paper_csv/paper.csv", index=False)
+        from src.library_index import remove_paper_from_library
+
+        remove_paper_from_library(arxiv_id)
     else:
         regist_arxive_id(arxiv_id)
+        # Review 페이지를 열기 전에 PDF, 인덱스, 번역을 미리 준비
+        prefetch_paper(arxiv_id, index_options=st.session_state.get("index_options"))
 
 
 # Streamlit app
@@ -60,7 +147,9 @@ def display_arxiv_results(results, summary=False):
     st.subheader("Arxiv 논문 검색 결과")
 
     # Display results in cards
+    count = 0
     for i, paper in enumerate(results):
+        count += 1
         with st.container(border=True):
             if summary:
                 st.markdown(
@@ -99,3 +188,5 @@ Authors: {', '.join(author.name for author in paper.authors)}
                     on_change=on_change_interest_paper_list,
                     args=(arxive_id,),
                 )
+
+    return count
@@ -0,0 +1,276 @@
+import re
+
+MIN_TEXT_OVERLAP = 20
+
+
+def _get_encoding():
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+_encoding = None
+
+
+def _encoder():
+    global _encoding
+    if _encoding is None:
+        _encoding = _get_encoding()
+    return _encoding
+
+
+def count_tokens(text):
+    return len(_encoder().encode(text))
+
+
+def truncate_tokens(text, max_tokens):
+    tokens = _encoder().encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _encoder().decode(tokens[:max_tokens])
+
+
+def _source_key(doc):
+    metadata = doc.metadata
+    return str(
+        metadata.get("source") or metadata.get("Entry ID") or metadata.get("Title") or ""
+    )
+
+
+def _text_overlap(left, right):
+    # left의 끝과 right의 시작이 겹치는 길이 (start_index가 없는 기존 인덱스용)
+    for size in range(min(len(left), len(right)), MIN_TEXT_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _part(text, tail, rank, start):
+    # 병합된 span을 이루는 원래 청크. tail은 앞 청크에 이어 붙일 때 실제로 추가된 부분
+    return {"text": text, "tail": tail, "rank": rank, "start": start}
+
+
+def merge_chunks(docs):
+    """같은 출처에서 인접하거나 겹치는 청크를 하나의 연속된 span으로 합침"""
+    spans = []
+    for rank, doc in enumerate(docs):
+        start = doc.metadata.get("start_index")
+        spans.append(
+            {
+                "source": _source_key(doc),
+                "start": start,
+                "end": start + len(doc.page_content) if start is not None else None,
+                "text": doc.page_content,
+                "rank": rank,
+                "metadata": doc.metadata,
+                "parts": [_part(doc.page_content, doc.page_content, rank, start)],
+            }
+        )
+
+    merged = []
+    by_source = {}
+    for span in spans:
+        by_source.setdefault(span["source"], []).append(span)
+
+    for source_spans in by_source.values():
+        positioned = sorted(
+            (s for s in source_spans if s["start"] is not None),
+            key=lambda s: s["start"],
+        )
+        for span in positioned:
+            last = merged[-1] if merged else None
+            if (
+                last is not None
+                and last["source"] == span["source"]
+                and last["start"] is not None
+                and span["start"] <= last["end"] + 1
+            ):
+                if span["end"] > last["end"]:
+                    overlap = last["end"] - span["start"]
+                    separator = " " if overlap < 0 else ""
+                    tail = separator + span["text"][max(overlap, 0) :]
+                    last["text"] += tail
+                    last["end"] = span["end"]
+                    last["parts"].append(
+                        _part(span["text"], tail, span["rank"], span["start"])
+                    )
+                else:
+                    # 앞 청크 안에 완전히 포함되면 순위만 반영
+                    part = last["parts"][-1]
+                    part["rank"] = min(part["rank"], span["rank"])
+                last["rank"] = min(last["rank"], span["rank"])
+            else:
+                merged.append(dict(span, parts=list(span["parts"])))
+
+        # 위치 정보가 없으면 텍스트 겹침으로 이어 붙임
+        for span in (s for s in source_spans if s["start"] is None):
+            for other in merged:
+                if other["source"] != span["source"] or other["start"] is not None:
+                    continue
+                if span["text"] in other["text"]:
+                    other["rank"] = min(other["rank"], span["rank"])
+                    break
+                overlap = _text_overlap(other["text"], span["text"])
+                if overlap:
+                    tail = span["text"][overlap:]
+                    other["text"] += tail
+                    other["rank"] = min(other["rank"], span["rank"])
+                    other["parts"].append(_part(span["text"], tail, span["rank"], None))
+                    break
+                overlap = _text_overlap(span["text"], other["text"])
+                if overlap:
+                    other["text"] = span["text"] + other["text"][overlap:]
+                    other["rank"] = min(other["rank"], span["rank"])
+                    first = other["parts"][0]
+                    other["parts"][0] = dict(first, tail=first["text"][overlap:])
+                    other["parts"].insert(
+                        0, _part(span["text"], span["text"], span["rank"], None)
+                    )
+                    break
+            else:
+                merged.append(dict(span, parts=list(span["parts"])))
+
+    return merged
+
+
+def _window_text(parts):
+    return parts[0]["text"] + "".join(part["tail"] for part in parts[1:])
+
+
+def truncate_span(span, token_budget):
+    """span이 예산보다 크면 청크 경계에서 잘라 가장 순위가 높은 청크 주변만 남김
+
+    가장 순위가 높은 청크 하나도 들어가지 않으면 None
+    """
+    parts = span["parts"]
+    best = min(range(len(parts)), key=lambda i: parts[i]["rank"])
+    lo = hi = best
+    if count_tokens(parts[best]["text"]) > token_budget:
+        return None
+
+    # 양옆 청크 중 순위가 높은 쪽부터 예산이 허락하는 만큼 넓힘
+    while True:
+        candidates = []
+        if lo > 0:
+            candidates.append((parts[lo - 1]["rank"], lo - 1, hi))
+        if hi < len(parts) - 1:
+            candidates.append((parts[hi + 1]["rank"], lo, hi + 1))
+        for _, new_lo, new_hi in sorted(candidates):
+            if count_tokens(_window_text(parts[new_lo : new_hi + 1])) <= token_budget:
+                lo, hi = new_lo, new_hi
+                break
+        else:
+            break
+
+    window = parts[lo : hi + 1]
+    text = _window_text(window)
+    start = window[0]["start"]
+    return dict(
+        span,
+        text=text,
+        start=start,
+        end=start + len(text) if start is not None else None,
+        rank=min(part["rank"] for part in window),
+        parts=window,
+    )
+
+
+def _words(text):
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def mmr_order(spans, lambda_mult=0.7):
+    """검색 순위를 관련도로, 단어 집합 유사도를 중복도로 사용하는 MMR 순서"""
+    if not spans:
+        return []
+
+    max_rank = max(s["rank"] for s in spans) + 1
+    words = [_words(s["text"]) for s in spans]
+    remaining = list(range(len(spans)))
+    selected = []
+
+    while remaining:
+        best, best_score = None, None
+        for i in remaining:
+            relevance = 1 - spans[i]["rank"] / max_rank
+            redundancy = max((_jaccard(words[i], words[j]) for j in selected), default=0)
+            score = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            if best_score is None or score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+        remaining.remove(best)
+
+    return [spans[i] for i in selected]
+
+
+def _truncate_to_best_part(span, token_budget):
+    best = min(span["parts"], key=lambda part: part["rank"])
+    text = truncate_tokens(best["text"], max(token_budget, 1))
+    start = best["start"]
+    return dict(
+        span,
+        text=text,
+        start=start,
+        end=start + len(text) if start is not None else None,
+        rank=best["rank"],
+        parts=[dict(best, text=text, tail=text)],
+    )
+
+
+def pack_context(docs, token_budget=1000, lambda_mult=0.7, baseline_k=None):
+    """검색 결과를 병합·다양화한 뒤 토큰 예산 안에서 원문 순서로 묶음
+
+    (context, stats)를 반환하며 stats의 saved_tokens는 상위 baseline_k개 청크를
+    그대로 이어 붙이던 기존 프롬프트 대비 절약한 토큰 수
+    """
+    baseline_docs = docs[:baseline_k] if baseline_k else docs
+    naive_tokens = count_tokens("\n\n".join(doc.page_content for doc in baseline_docs))
+
+    packed, used = [], 0
+    for span in mmr_order(merge_chunks(docs), lambda_mult):
+        tokens = count_tokens(span["text"])
+        if used + tokens > token_budget:
+            # 통째로 버리지 않고 청크 경계에서 잘라 남은 예산에 맞춤
+            truncated = truncate_span(span, token_budget - used)
+            if truncated is None and not packed:
+                # 가장 순위가 높은 청크 하나도 예산보다 크면 토큰 단위로 잘라서라도 넣음
+                # (빈 컨텍스트로 질문하지 않도록)
+                truncated = _truncate_to_best_part(span, token_budget - used)
+            if truncated is None:
+                continue
+            span = truncated
+            tokens = count_tokens(span["text"])
+        packed.append(span)
+        used += tokens
+
+    # 원문 순서: 출처별로 모은 뒤 문서 내 위치(자막은 시작 시간, 없으면 검색 순위) 순
+    source_order = {}
+    for span in sorted(packed, key=lambda s: s["rank"]):
+        source_order.setdefault(span["source"], len(source_order))
+    packed.sort(
+        key=lambda s: (
+            source_order[s["source"]],
+            s["start"] if s["start"] is not None else s["metadata"].get("start", s["rank"]),
+        )
+    )
+
+    context = "\n\n".join(span["text"] for span in packed)
+    packed_tokens = count_tokens(context)
+    stats = {
+        "retrieved_chunks": len(docs),
+        "packed_spans": len(packed),
+        "naive_tokens": naive_tokens,
+        "packed_tokens": packed_tokens,
+        "saved_tokens": naive_tokens - packed_tokens,
+        "spans": packed,
+    }
+    return context, stats
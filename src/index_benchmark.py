@@ -0,0 +1,126 @@
+"""현재 flat 인덱스 대비 축소 차원·양자화 인덱스의 recall/메모리/검색 시간 비교
+
+사용법:
+    python -m src.index_benchmark ./data/vector_db/<arxiv_id>_paper_pdf
+
+저장된 벡터 근처의 합성 질의를 사용하므로 OpenAI API를 호출하지 않음
+(--questions로 실제 질문 파일을 주면 질문 임베딩에만 API를 사용)
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from src.vector_index import (
+    FULL_DIMENSIONS,
+    INDEX_TYPES,
+    MIN_PQ_TRAIN_SIZE,
+    create_faiss_index,
+    extract_vectors,
+    get_embeddings,
+    reduce_dimensions,
+)
+
+
+def make_queries(vectors, num_queries=100, noise=0.75, seed=0):
+    """저장된 청크 근처의 벡터를 질의로 사용
+
+    noise는 단위 벡터에 더하는 잡음 벡터 전체의 크기로, 차원마다 noise/sqrt(d)의 표준편차를 줌
+    (0.75면 원래 청크와의 cosine이 약 0.8로 실제 질문-청크 유사도와 비슷한 수준)
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+    d = vectors.shape[1]
+    queries = vectors[picks] + rng.normal(0, noise / np.sqrt(d), (len(picks), d))
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def embed_questions(path, dimensions):
+    # 실제 질문 문장으로 측정할 때만 OpenAI 임베딩 API를 호출
+    with open(path, "r", encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    embeddings = get_embeddings(dimensions if dimensions != FULL_DIMENSIONS else None)
+    queries = np.asarray(embeddings.embed_documents(questions), dtype="float32")
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def run_benchmark(
+    vectors, dimensions_list, index_types, k=8, num_queries=100, queries=None
+):
+    vectors = np.asarray(vectors, dtype="float32")
+    if queries is None:
+        queries = make_queries(vectors, num_queries)
+
+    # 기준: 전체 차원 flat 인덱스의 정확한 top-k
+    baseline = faiss.IndexFlatL2(vectors.shape[1])
+    baseline.add(vectors)
+    _, truth = baseline.search(queries, k)
+
+    rows = []
+    for dimensions in dimensions_list:
+        reduced = reduce_dimensions(vectors, dimensions)
+        reduced_queries = reduce_dimensions(queries, dimensions)
+        for index_type in index_types:
+            # 벡터가 부족하면 ivfpq는 sq8로 대체되므로 같은 결과를 두 번 출력하지 않음
+            if index_type == "ivfpq" and len(vectors) < MIN_PQ_TRAIN_SIZE:
+                continue
+            index = create_faiss_index(reduced, index_type)
+
+            start = time.perf_counter()
+            _, found = index.search(reduced_queries, k)
+            latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            recall = np.mean(
+                [len(set(f) & set(t)) / k for f, t in zip(found.tolist(), truth.tolist())]
+            )
+            rows.append(
+                {
+                    "dimensions": reduced.shape[1],
+                    "index_type": type(index).__name__,
+                    "recall": recall,
+                    "memory_kb": len(faiss.serialize_index(index)) / 1024,
+                    "latency_ms": latency_ms,
+                }
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db_path", help="비교 기준이 될 flat FAISS 인덱스 디렉토리")
+    parser.add_argument("-k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument(
+        "--dimensions", type=int, nargs="+", default=[FULL_DIMENSIONS, 1024, 512, 256]
+    )
+    parser.add_argument("--questions", help="한 줄에 질문 하나씩 적힌 텍스트 파일")
+    args = parser.parse_args()
+
+    index = faiss.read_index(f"{args.db_path}/index.faiss")
+    vectors = extract_vectors(index)
+    print(f"{args.db_path}: {index.ntotal} vectors, {index.d} dims")
+    if index.ntotal < MIN_PQ_TRAIN_SIZE:
+        print(f"(벡터가 {MIN_PQ_TRAIN_SIZE}개 미만이라 ivfpq는 측정하지 않음)")
+    print()
+
+    queries = None
+    if args.questions:
+        queries = embed_questions(args.questions, index.d)
+    rows = run_benchmark(
+        vectors, args.dimensions, INDEX_TYPES, args.k, args.queries, queries
+    )
+    print(f"{'dims':>6} {'index':<22} {'recall@' + str(args.k):>9} {'memory(KB)':>11} {'ms/query':>9}")
+    for row in rows:
+        print(
+            f"{row['dimensions']:>6} {row['index_type']:<22} {row['recall']:>9.3f} "
+            f"{row['memory_kb']:>11.1f} {row['latency_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from src.single_flight import file_lock
+from src.vector_index import (
+    FULL_DIMENSIONS,
+    extract_vectors,
+    get_embeddings,
+    load_index_config,
+    load_vector_store,
+    reduce_dimensions,
+    save_vector_store,
+)
+
+LIBRARY_DIR = "./data/vector_db/library"
+NUM_SHARDS = 4
+# None이면 전체 차원 사용. 더 큰 차원의 논문 인덱스는 잘라서 넣고, 더 작은 것은 제외하고
+# manifest의 "excluded"에 기록 (논문 인덱스를 다시 만들기 전까지 다시 시도하지 않음)
+LIBRARY_DIMENSIONS = None
+
+_shard_cache = {}
+
+
+def paper_db_path(arxiv_id):
+    return f"./data/vector_db/{arxiv_id}_paper_pdf"
+
+
+def _index_mtime(db_path):
+    index_file = os.path.join(db_path, "index.faiss")
+    return os.path.getmtime(index_file) if os.path.exists(index_file) else None
+
+
+class LibraryIndex:
+    """관심 논문 전체를 검색하기 위한 샤딩된 전역 인덱스
+
+    논문별 인덱스의 벡터를 그대로 복사해 만들기 때문에 임베딩을 다시 계산하지 않음
+    """
+
+    def __init__(
+        self,
+        dimensions=LIBRARY_DIMENSIONS,
+        library_dir=LIBRARY_DIR,
+        num_shards=NUM_SHARDS,
+    ):
+        self.dimensions = dimensions
+        self._embeddings = None
+        self.library_dir = library_dir
+        self.num_shards = num_shards
+        self.manifest_path = os.path.join(library_dir, "manifest.json")
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = get_embeddings(self.dimensions)
+        return self._embeddings
+
+    def shard_for(self, arxiv_id):
+        digest = hashlib.md5(arxiv_id.encode("utf-8")).hexdigest()
+        return int(digest, 16) % self.num_shards
+
+    def shard_path(self, shard):
+        return os.path.join(self.library_dir, f"shard_{shard}")
+
+    def shard_paths(self):
+        return [self.shard_path(shard) for shard in range(self.num_shards)]
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"papers": {}, "excluded": {}}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest.setdefault("excluded", {})
+        return manifest
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.library_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load_shard(self, shard, fresh=False):
+        """샤드를 불러옴. fresh=True면 검색 중인 캐시 객체 대신 수정용 새 객체를 반환"""
+        path = self.shard_path(shard)
+        mtime = _index_mtime(path)
+        if mtime is None:
+            return None
+
+        cached = _shard_cache.get(path)
+        if not fresh and cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        from langchain.vectorstores import FAISS
+
+        db = FAISS.load_local(
+            path, self.embeddings, allow_dangerous_deserialization=True
+        )
+        if not fresh:
+            _shard_cache[path] = (mtime, db)
+        return db
+
+    def _save_shard(self, shard, db):
+        # 수정한 복사본을 저장한 뒤 캐시 항목을 통째로 교체 (검색 중인 객체는 건드리지 않음)
+        path = self.shard_path(shard)
+        if db is None or db.index.ntotal == 0:
+            shutil.rmtree(path, ignore_errors=True)
+            _shard_cache.pop(path, None)
+            return
+        save_vector_store(db, path, self.dimensions)
+        _shard_cache[path] = (_index_mtime(path), db)
+
+    def _delete_entry(self, entry):
+        # self.manifest_path 파일 락을 잡은 상태에서 호출
+        shard_db = self._load_shard(entry["shard"], fresh=True)
+        if shard_db is not None:
+            shard_db.delete(entry["ids"])
+            self._save_shard(entry["shard"], shard_db)
+
+    def add_paper(self, arxiv_id):
+        arxiv_id = str(arxiv_id)
+        db_path = paper_db_path(arxiv_id)
+        mtime = _index_mtime(db_path)
+        if mtime is None:
+            return False
+
+        with file_lock(self.manifest_path):
+            manifest = self.load_manifest()
+            entry = manifest["papers"].get(arxiv_id)
+            if entry is not None and entry.get("mtime") == mtime:
+                return True
+
+            # 논문 인덱스가 다시 만들어졌으면 이전 벡터를 지우고 새로 넣음
+            if entry is not None:
+                self._delete_entry(manifest["papers"].pop(arxiv_id))
+
+            # 인덱스를 불러오기 전에 설정 파일로 차원을 먼저 확인
+            required = self.dimensions or FULL_DIMENSIONS
+            dimensions = load_index_config(db_path)["dimensions"] or FULL_DIMENSIONS
+            if dimensions < required:
+                manifest["excluded"][arxiv_id] = {
+                    "reason": f"임베딩 차원 {dimensions} < 라이브러리 {required}",
+                    "mtime": mtime,
+                }
+                self._save_manifest(manifest)
+                return False
+
+            paper_db = load_vector_store(db_path)
+            vectors = reduce_dimensions(extract_vectors(paper_db.index), self.dimensions)
+            texts, metadatas, ids = [], [], []
+            for position in range(paper_db.index.ntotal):
+                doc = paper_db.docstore.search(paper_db.index_to_docstore_id[position])
+                metadata = dict(doc.metadata)
+                metadata["arxiv_id"] = arxiv_id
+                texts.append(doc.page_content)
+                metadatas.append(metadata)
+                ids.append(f"{arxiv_id}:{position}")
+            text_embeddings = list(zip(texts, vectors.tolist()))
+
+            shard = self.shard_for(arxiv_id)
+            shard_db = self._load_shard(shard, fresh=True)
+            if shard_db is None:
+                from langchain.vectorstores import FAISS
+
+                shard_db = FAISS.from_embeddings(
+                    text_embeddings, self.embeddings, metadatas=metadatas, ids=ids
+                )
+            else:
+                shard_db.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+            self._save_shard(shard, shard_db)
+
+            title = metadatas[0].get("Title", arxiv_id) if metadatas else arxiv_id
+            manifest["papers"][arxiv_id] = {
+                "shard": shard,
+                "ids": ids,
+                "title": title,
+                "mtime": mtime,
+            }
+            manifest["excluded"].pop(arxiv_id, None)
+            self._save_manifest(manifest)
+        return True
+
+    def remove_paper(self, arxiv_id):
+        arxiv_id = str(arxiv_id)
+        with file_lock(self.manifest_path):
+            manifest = self.load_manifest()
+            entry = manifest["papers"].pop(arxiv_id, None)
+            if entry is None:
+                if manifest["excluded"].pop(arxiv_id, None) is not None:
+                    self._save_manifest(manifest)
+                return False
+
+            self._delete_entry(entry)
+            self._save_manifest(manifest)
+        return True
+
+    def sync(self, arxiv_ids):
+        """관심 논문 목록과 전역 인덱스를 맞춤 (인덱스가 없는 논문은 건너뜀)"""
+        arxiv_ids = set(str(arxiv_id) for arxiv_id in arxiv_ids)
+        manifest = self.load_manifest()
+        indexed = set(manifest["papers"]) | set(manifest["excluded"])
+        for arxiv_id in indexed - arxiv_ids:
+            self.remove_paper(arxiv_id)
+        for arxiv_id in arxiv_ids:
+            # 추가된 뒤나 제외된 뒤로 논문 인덱스가 다시 만들어졌을 때만 다시 처리
+            recorded = manifest["papers"].get(arxiv_id) or manifest["excluded"].get(
+                arxiv_id
+            )
+            if recorded and recorded.get("mtime") == _index_mtime(
+                paper_db_path(arxiv_id)
+            ):
+                continue
+            self.add_paper(arxiv_id)
+
+    def search(self, query, k=8):
+        shards = [s for s in range(self.num_shards) if _index_mtime(self.shard_path(s))]
+        if not shards:
+            return []
+
+        embedding = self.embeddings.embed_query(query)
+
+        def search_shard(shard):
+            db = self._load_shard(shard)
+            if db is None:
+                return []
+            return db.similarity_search_with_score_by_vector(embedding, k=k)
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            results = [hit for hits in executor.map(search_shard, shards) for hit in hits]
+
+        # L2 거리이므로 작을수록 가까움
+        results.sort(key=lambda hit: hit[1])
+        return [doc for doc, _ in results[:k]]
+
+
+def remove_paper_from_library(arxiv_id):
+    LibraryIndex().remove_paper(arxiv_id)
@@ -0,0 +1,28 @@
+import os
+from src.single_flight import single_flight
+from src.utils import load_docs_from_jsonl, save_docs_to_jsonl
+
+PAPER_DOCS_DIR = "./data/paper_pdf"
+
+
+def load_paper_docs(arxiv_id):
+    """논문 PDF를 내려받아 텍스트 문서로 반환 (한 번 받은 논문은 jsonl로 캐시)"""
+    file_path = f"{PAPER_DOCS_DIR}/{arxiv_id}.jsonl"
+    if os.path.exists(file_path):
+        return load_docs_from_jsonl(file_path)
+
+    def download():
+        from langchain_community.document_loaders import ArxivLoader
+
+        docs = ArxivLoader(arxiv_id).load()
+        if not docs:
+            raise ValueError(f"논문을 불러오지 못했습니다: {arxiv_id}")
+        save_docs_to_jsonl(docs, file_path)
+        return docs
+
+    return single_flight(
+        f"pdf:{arxiv_id}",
+        download,
+        done=lambda: os.path.exists(file_path),
+        load=lambda: load_docs_from_jsonl(file_path),
+    )
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.library_index import LibraryIndex, paper_db_path
+from src.paper_loader import load_paper_docs
+from src.translator import is_english, translate_abstract, translation_path
+from src.utils import current_user_id
+from src.vector_index import DEFAULT_INDEX_OPTIONS, load_or_build_vector_store
+
+# 관심 논문 초록을 미리 번역해 둘 언어 (Home 페이지의 Target Language 선택지)
+PREFETCH_LANGUAGES = ["ko", "en"]
+MAX_WORKERS = 2
+# 사용자(세션)별 동시 prefetch 수와 API 토큰 예산 (임베딩 + 초록 번역)
+PER_USER_CONCURRENCY = 1
+PER_USER_TOKEN_BUDGET = 1_000_000
+# 실패한 논문은 이 시간이 지나야 다시 시도
+RETRY_FAILED_SECONDS = 10 * 60
+
+
+def _lower_thread_priority():
+    # 화면 요청보다 CPU를 덜 쓰도록 워커 스레드의 우선순위를 낮춤 (Linux만 스레드 단위로 적용)
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+def estimate_tokens(docs):
+    return sum(len(doc.page_content) for doc in docs) // 4
+
+
+def estimate_translation_tokens(text):
+    # 프롬프트로 보내는 원문과 비슷한 길이의 번역문을 돌려받음
+    return 2 * (len(text) // 4)
+
+
+class PaperPrefetcher:
+    """관심 논문의 PDF, 논문 인덱스, 초록 번역을 백그라운드에서 미리 준비"""
+
+    def __init__(
+        self,
+        max_workers=MAX_WORKERS,
+        per_user_concurrency=PER_USER_CONCURRENCY,
+        per_user_token_budget=PER_USER_TOKEN_BUDGET,
+        languages=PREFETCH_LANGUAGES,
+    ):
+        self.per_user_concurrency = per_user_concurrency
+        self.per_user_token_budget = per_user_token_budget
+        self.languages = languages
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="prefetch",
+            initializer=_lower_thread_priority,
+        )
+        self._lock = threading.Lock()
+        self._status = {}
+        self._queues = {}
+        self._running = {}
+        self._spent_tokens = {}
+        self._failed_at = {}
+        # 예산은 사용자별이므로 예산 초과도 논문 상태가 아니라 (user_id, arxiv_id)로 기록
+        self._over_budget = set()
+
+    def status(self, arxiv_id):
+        return self._status.get(str(arxiv_id))
+
+    def submit(self, arxiv_id, abstract=None, user_id=None, index_options=None):
+        arxiv_id = str(arxiv_id)
+        user_id = user_id or current_user_id()
+        with self._lock:
+            # 예산을 넘긴 사용자는 같은 논문을 다시 넣지 않음 (Review 페이지에서 직접 만들 수 있음)
+            if (user_id, arxiv_id) in self._over_budget:
+                return
+            status = self._status.get(arxiv_id)
+            if status in ("queued", "running", "done"):
+                return
+            if (
+                status == "failed"
+                and time.time() - self._failed_at.get(arxiv_id, 0) < RETRY_FAILED_SECONDS
+            ):
+                return
+            self._status[arxiv_id] = "queued"
+            self._queues.setdefault(user_id, deque()).append(
+                (arxiv_id, abstract, index_options or DEFAULT_INDEX_OPTIONS)
+            )
+            self._dispatch(user_id)
+
+    def _dispatch(self, user_id):
+        # self._lock을 잡은 상태에서 호출
+        queue = self._queues.get(user_id)
+        while queue and self._running.get(user_id, 0) < self.per_user_concurrency:
+            job = queue.popleft()
+            self._running[user_id] = self._running.get(user_id, 0) + 1
+            self._executor.submit(self._run, user_id, *job)
+
+    def _run(self, user_id, arxiv_id, abstract, index_options):
+        self._status[arxiv_id] = "running"
+        try:
+            status = self._prefetch(user_id, arxiv_id, abstract, index_options)
+            if status == "over_budget":
+                # 다른 사용자는 자신의 예산으로 이 논문을 준비할 수 있도록 논문 상태는 비워 둠
+                with self._lock:
+                    self._over_budget.add((user_id, arxiv_id))
+                    self._status.pop(arxiv_id, None)
+            else:
+                self._status[arxiv_id] = status
+        except Exception:
+            # 실패해도 사용자가 Review 페이지에서 직접 만들 수 있으므로 무시
+            self._failed_at[arxiv_id] = time.time()
+            self._status[arxiv_id] = "failed"
+        finally:
+            with self._lock:
+                self._running[user_id] -= 1
+                self._dispatch(user_id)
+
+    def _charge(self, user_id, tokens):
+        """예산 안이면 tokens만큼 사용한 것으로 기록하고 True"""
+        with self._lock:
+            spent = self._spent_tokens.get(user_id, 0)
+            if spent + tokens > self.per_user_token_budget:
+                return False
+            self._spent_tokens[user_id] = spent + tokens
+            return True
+
+    def _prefetch(self, user_id, arxiv_id, abstract, index_options):
+        db_path = paper_db_path(arxiv_id)
+        docs = None
+        if not os.path.exists(db_path):
+            docs = load_paper_docs(arxiv_id)
+            if not self._charge(user_id, estimate_tokens(docs)):
+                return "over_budget"
+
+            # Review 페이지의 '인덱스 옵션'에서 고른 차원·인덱스 타입으로 생성
+            load_or_build_vector_store(db_path, lambda: docs, **index_options)
+            LibraryIndex().add_paper(arxiv_id)
+
+        if abstract is None:
+            if docs is None:
+                docs = load_paper_docs(arxiv_id)
+            abstract = docs[0].metadata.get("Summary") if docs else None
+        if abstract:
+            for language in self.languages:
+                # 이미 영어인 초록은 영어로 번역하지 않음
+                if language == "en" and is_english(abstract):
+                    continue
+                if os.path.exists(translation_path(arxiv_id, language)):
+                    continue
+                if not self._charge(user_id, estimate_translation_tokens(abstract)):
+                    return "over_budget"
+                translate_abstract(arxiv_id, abstract, language)
+
+        return "done"
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = PaperPrefetcher()
+    return _prefetcher
+
+
+def prefetch_paper(arxiv_id, abstract=None, index_options=None):
+    get_prefetcher().submit(arxiv_id, abstract, index_options=index_options)
@@ -0,0 +1,266 @@
+import difflib
+import json
+import os
+import threading
+import time
+
+from src.single_flight import file_lock
+
+REVIEW_DIR = "./data/review_markdown"
+# 이 개수만큼 delta가 쌓이면 스냅샷으로 합침
+COMPACT_EVERY = 20
+AUTOSAVE_DEBOUNCE_SECONDS = 2.0
+
+
+class ReviewConflictError(Exception):
+    """저장하려는 리뷰가 그 사이 다른 곳에서 먼저 수정된 경우"""
+
+    def __init__(self, arxiv_id, expected_version, current_version, current_text):
+        super().__init__(
+            f"{arxiv_id} 리뷰가 다른 곳에서 수정되었습니다 "
+            f"(기준 버전 {expected_version}, 현재 버전 {current_version})"
+        )
+        self.expected_version = expected_version
+        self.current_version = current_version
+        self.current_text = current_text
+
+
+def make_delta(old_text, new_text):
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(text, ops):
+    lines = text.splitlines(keepends=True)
+    # 뒤에서부터 적용해야 앞쪽 인덱스가 바뀌지 않음
+    for i1, i2, replacement in reversed(ops):
+        lines[i1:i2] = replacement
+    return "".join(lines)
+
+
+class ReviewStore:
+    """arxiv_id별 리뷰 저장소 (스냅샷 + append-only delta, 낙관적 동시성 제어)
+
+    디렉토리 구조: {REVIEW_DIR}/{arxiv_id}/snapshot.json, deltas.jsonl
+    """
+
+    def __init__(
+        self,
+        root=REVIEW_DIR,
+        compact_every=COMPACT_EVERY,
+        debounce_seconds=AUTOSAVE_DEBOUNCE_SECONDS,
+    ):
+        self.root = root
+        self.compact_every = compact_every
+        self.debounce_seconds = debounce_seconds
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._autosave = {}
+        # 같은 세션의 저장은 하나씩만 실행 (다른 세션은 기다리지 않음)
+        self._save_locks = {}
+
+    def _paths(self, arxiv_id):
+        directory = os.path.join(self.root, str(arxiv_id))
+        return (
+            directory,
+            os.path.join(directory, "snapshot.json"),
+            os.path.join(directory, "deltas.jsonl"),
+        )
+
+    def _stamp(self, arxiv_id):
+        stamp = []
+        for path in self._paths(arxiv_id)[1:]:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            else:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _read(self, arxiv_id):
+        """(text, version, 스냅샷 이후 delta 수)를 반환"""
+        _, snapshot_path, deltas_path = self._paths(arxiv_id)
+        text, version = "", 0
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            text, version = snapshot["text"], snapshot["version"]
+
+        pending = 0
+        if os.path.exists(deltas_path):
+            with open(deltas_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        # 저장 도중 중단되어 잘린 줄은 무시
+                        continue
+                    if delta["version"] <= version:
+                        continue
+                    if delta["parent"] != version:
+                        break
+                    text = apply_delta(text, delta["ops"])
+                    version = delta["version"]
+                    pending += 1
+        return text, version, pending
+
+    def exists(self, arxiv_id):
+        return self.load(arxiv_id)[1] > 0
+
+    def load(self, arxiv_id):
+        """(text, version)을 반환. 파일이 바뀌지 않았으면 메모리 캐시를 사용"""
+        stamp = self._stamp(arxiv_id)
+        with self._cache_lock:
+            cached = self._cache.get(arxiv_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1], cached[2]
+
+        text, version, _ = self._read(arxiv_id)
+        with self._cache_lock:
+            self._cache[arxiv_id] = (stamp, text, version)
+        return text, version
+
+    def save(self, arxiv_id, text, expected_version):
+        """expected_version이 현재 버전과 같을 때만 저장하고 새 버전을 반환"""
+        directory, _, deltas_path = self._paths(arxiv_id)
+        os.makedirs(directory, exist_ok=True)
+
+        with file_lock(f"review:{arxiv_id}"):
+            current_text, version, pending = self._read(arxiv_id)
+            if version != expected_version:
+                raise ReviewConflictError(
+                    arxiv_id, expected_version, version, current_text
+                )
+            if text == current_text:
+                return version
+
+            delta = {
+                "version": version + 1,
+                "parent": version,
+                "ops": make_delta(current_text, text),
+                "saved_at": time.time(),
+            }
+            line = json.dumps(delta, ensure_ascii=False) + "\n"
+            with open(deltas_path, "ab+") as f:
+                # 이전 저장이 중간에 끊겨 줄바꿈이 없으면 새 줄에서 시작
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            version += 1
+
+            if pending + 1 >= self.compact_every:
+                self._compact(arxiv_id, text, version)
+
+        stamp = self._stamp(arxiv_id)
+        with self._cache_lock:
+            self._cache[arxiv_id] = (stamp, text, version)
+        return version
+
+    def _compact(self, arxiv_id, text, version):
+        # 스냅샷을 먼저 교체한 뒤 delta를 비우므로 어느 시점에 중단되어도 내용이 유지됨
+        _, snapshot_path, deltas_path = self._paths(arxiv_id)
+        tmp_path = f"{snapshot_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "text": text}, f, ensure_ascii=False)
+        os.replace(tmp_path, snapshot_path)
+
+        tmp_path = f"{deltas_path}.tmp-{os.getpid()}"
+        open(tmp_path, "w").close()
+        os.replace(tmp_path, deltas_path)
+
+    def schedule_save(self, arxiv_id, session_id, text, expected_version):
+        """마지막 입력 후 debounce_seconds 동안 변경이 없으면 저장"""
+        key = (arxiv_id, session_id)
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is not None:
+                timer.cancel()
+
+            # 이 세션이 자동 저장한 버전이 더 최신이면 그 버전을 기준으로 삼음
+            state = self._autosave.get(key, {})
+            if state.get("status") == "saved":
+                expected_version = max(expected_version, state["version"])
+
+            self._autosave[key] = {
+                "status": "pending",
+                "text": text,
+                "version": expected_version,
+            }
+            timer = threading.Timer(self.debounce_seconds, self.flush, args=key)
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+
+    def flush(self, arxiv_id, session_id):
+        """예약된 자동 저장을 즉시 실행하고 상태를 반환"""
+        key = (arxiv_id, session_id)
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            save_lock = self._save_locks.setdefault(key, threading.Lock())
+
+        with save_lock:
+            with self._lock:
+                pending = self._autosave.get(key)
+            if pending is None or pending["status"] != "pending":
+                return pending
+
+            # 파일 락과 fsync를 기다리는 동안 다른 세션의 schedule_save가 막히지 않도록
+            # 저장은 self._lock 밖에서 실행
+            try:
+                version = self.save(arxiv_id, pending["text"], pending["version"])
+                state = {"status": "saved", "text": pending["text"], "version": version}
+            except ReviewConflictError as e:
+                # 사용자가 입력한 내용은 그대로 두고 충돌 상태로 남김
+                state = dict(pending, status="conflict", error=e)
+
+            with self._lock:
+                current = self._autosave.get(key)
+                if current is pending:
+                    self._autosave[key] = state
+                elif (
+                    current is not None
+                    and current["status"] == "pending"
+                    and current["version"] == pending["version"]
+                    and state["status"] == "saved"
+                ):
+                    # 저장하는 동안 새 입력이 예약되었으면 방금 저장한 버전을 기준으로 삼음
+                    current["version"] = state["version"]
+            return state
+
+    def autosave_state(self, arxiv_id, session_id):
+        with self._lock:
+            return self._autosave.get((arxiv_id, session_id))
+
+    def clear_autosave(self, arxiv_id, session_id):
+        with self._lock:
+            timer = self._timers.pop((arxiv_id, session_id), None)
+            if timer is not None:
+                timer.cancel()
+            self._autosave.pop((arxiv_id, session_id), None)
+
+
+_review_store = None
+_review_store_lock = threading.Lock()
+
+
+def get_review_store():
+    global _review_store
+    with _review_store_lock:
+        if _review_store is None:
+            _review_store = ReviewStore()
+    return _review_store
@@ -0,0 +1,50 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+
+from filelock import FileLock
+
+LOCK_DIR = "./data/locks"
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def file_lock(key):
+    """프로세스 간 잠금 (분산 락 대신 로컬 파일 락 사용)"""
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return FileLock(os.path.join(LOCK_DIR, f"{digest}.lock"))
+
+
+def single_flight(key, fn, done=None, load=None):
+    """같은 key의 작업을 한 번만 실행하고 나머지 호출자는 그 결과를 기다림
+
+    - 같은 프로세스의 다른 스레드는 먼저 시작한 호출의 결과(또는 예외)를 그대로 받음
+    - 다른 프로세스는 파일 락을 기다린 뒤 done()이 참이면 fn 대신 load()로 결과를 읽음
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not leader:
+        return future.result()
+
+    try:
+        with file_lock(key):
+            if done is not None and done():
+                result = load() if load is not None else None
+            else:
+                result = fn()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
@@ -0,0 +1,183 @@
+"""페이지 시작 시간과 import 시간 측정
+
+- 앱에서: STARTUP_PROFILE=1 환경 변수 또는 URL에 ?profile=1을 붙이면 사이드바에
+  이번 실행의 렌더링 시간과 패키지별 import 시간을 표시
+- CLI에서: python -m src.startup_profile 로 새 프로세스 기준(cold) import 시간을 측정
+"""
+
+import builtins
+import itertools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = "STARTUP_PROFILE"
+# Home 페이지 cold 렌더링 목표 시간
+STARTUP_BUDGET_MS = 1500
+
+_original_import = builtins.__import__
+STDLIB_MODULES = getattr(sys, "stdlib_module_names", frozenset())
+_local = threading.local()
+_hook_lock = threading.Lock()
+_hook_users = 0
+
+
+def profile_enabled():
+    if os.getenv(PROFILE_ENV) == "1":
+        return True
+    import streamlit as st
+
+    return st.query_params.get("profile") == "1"
+
+
+def _profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 측정 중인 스레드(이번 실행)가 아니거나 이미 로드된 모듈이면 그대로 import
+    times = getattr(_local, "times", None)
+    if times is None or (name in sys.modules and not fromlist and not level):
+        return _original_import(name, globals, locals, fromlist, level)
+
+    # 안쪽 import에 걸린 시간은 stack에 모아 바깥 import 시간에서 뺌 (패키지별 자기 시간)
+    stack = _local.stack
+    loaded = len(sys.modules)
+    stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        # sys.modules는 삽입 순서를 유지하므로 뒤에 추가된 키가 이번에 새로 로드된 모듈
+        new = [m.split(".")[0] for m in itertools.islice(sys.modules, loaded, None)]
+        if new:
+            package = name.split(".")[0]
+            if level or package not in new:
+                package = new[0]
+            # 표준 라이브러리는 하나로 묶어 서드파티 패키지별 비용이 잘 보이도록 함
+            if package in STDLIB_MODULES or package.startswith("_"):
+                package = "(stdlib)"
+            times[package] = times.get(package, 0) + elapsed - nested
+            if stack:
+                stack[-1] += elapsed
+        # 새로 로드된 모듈이 없으면 바깥 import 시간에 포함됨
+
+
+@contextmanager
+def profile_imports():
+    """with 블록 안에서 이 스레드가 새로 import한 패키지별 시간을 담은 dict를 yield
+
+    프로파일링이 꺼져 있으면 아무것도 하지 않음. 블록을 벗어나면 (st.stop 등 예외로 벗어나도)
+    import hook을 해제하므로 다른 세션에는 영향이 남지 않음
+    """
+    global _hook_users
+    times = {}
+    if not profile_enabled():
+        yield times
+        return
+
+    with _hook_lock:
+        _hook_users += 1
+        builtins.__import__ = _profiled_import
+    _local.times = times
+    _local.stack = []
+    try:
+        yield times
+    finally:
+        _local.times = None
+        with _hook_lock:
+            _hook_users -= 1
+            if _hook_users == 0:
+                builtins.__import__ = _original_import
+
+
+def render_startup_profile(start_time, import_times, budget_ms=STARTUP_BUDGET_MS):
+    import streamlit as st
+
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    with st.sidebar.expander("⏱️ Startup profile", expanded=True):
+        status = "✅" if elapsed_ms <= budget_ms else "⚠️"
+        st.markdown(f"{status} 렌더링 **{elapsed_ms:.0f}ms** (목표 {budget_ms}ms)")
+        if import_times:
+            rows = sorted(import_times.items(), key=lambda x: x[1], reverse=True)
+            st.table(
+                {
+                    "package": [name for name, _ in rows],
+                    "import (ms)": [f"{seconds * 1000:.0f}" for _, seconds in rows],
+                }
+            )
+        else:
+            st.caption("이번 실행에서 새로 import된 모듈이 없습니다 (warm).")
+
+
+# 페이지별로 처음 렌더링할 때 import되는 모듈과, 사용할 때만 import되는 무거운 모듈
+PAGE_IMPORTS = {
+    "Home.py": [
+        "streamlit",
+        "pandas",
+        "arxiv",
+        "src.arxiv_search",
+        "src.translator",
+        "src.utils",
+        "src.prefetch",
+    ],
+    "Review page": [
+        "src.answer_cache",
+        "src.context_packer",
+        "src.library_index",
+        "src.paper_loader",
+        "src.prefetch",
+        "src.review_store",
+        "src.transcript",
+        "src.vector_index",
+    ],
+    "YouTube Search": ["src.youtube_search", "src.transcript", "src.single_flight"],
+}
+LAZY_IMPORTS = [
+    "langchain_community.document_loaders",
+    "langchain_community.document_transformers",
+    "langchain_text_splitters",
+    "langchain.embeddings.openai",
+    "langchain.vectorstores",
+    "langchain.chat_models.openai",
+    "langchain.retrievers",
+    "googleapiclient.discovery",
+    "faiss",
+    "tiktoken",
+]
+
+
+def measure_cold_import(module_name):
+    """새 파이썬 프로세스에서 모듈 하나를 import하는 데 걸리는 시간(ms)"""
+    import subprocess
+
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module_name}; "
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    def report(title, modules):
+        print(title)
+        for module_name in modules:
+            ms = measure_cold_import(module_name)
+            value = f"{ms:8.0f} ms" if ms is not None else "   failed"
+            print(f"  {module_name:<45}{value}")
+        print()
+
+    for page, modules in PAGE_IMPORTS.items():
+        report(f"[{page}] 시작 시 import", modules)
+    report("[lazy] 처음 사용할 때 import", LAZY_IMPORTS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import streamlit as st
+
+# RAG용 청크 하나에 담을 자막 길이(초)와 화면에 한 번에 보여줄 자막 수
+CHUNK_SECONDS = 30
+# 말이 빠른 영상에서 청크가 너무 커지지 않도록 청크 하나의 최대 글자 수도 제한
+CHUNK_MAX_CHARS = 1000
+SEGMENTS_PER_PAGE = 50
+# 타임스탬프가 없는 기존 스크립트는 글자 수로 페이지를 나눔
+CHARS_PER_PAGE = 3000
+
+
+def fetch_caption_segments(url, languages=("en", "ko")):
+    """유튜브 자막을 타임스탬프가 있는 문서 목록(자막 한 줄 = 문서 하나)으로 반환"""
+    from langchain.schema import Document
+    from langchain_community.document_loaders import YoutubeLoader
+    from youtube_transcript_api import NoTranscriptFound, YouTubeTranscriptApi
+
+    video_id = YoutubeLoader.extract_video_id(url)
+    transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
+    try:
+        transcript = transcripts.find_transcript(list(languages))
+    except NoTranscriptFound:
+        transcript = next(iter(transcripts))
+
+    return [
+        Document(
+            page_content=segment["text"].replace("\n", " "),
+            metadata={
+                "source": url,
+                "start": segment["start"],
+                "end": segment["start"] + segment["duration"],
+            },
+        )
+        for segment in transcript.fetch()
+    ]
+
+
+def is_timestamped(docs):
+    return bool(docs) and all("start" in doc.metadata for doc in docs)
+
+
+def chunk_by_time(segments, window_seconds=CHUNK_SECONDS, max_chars=CHUNK_MAX_CHARS):
+    """자막을 일정 시간(최대 max_chars 글자) 단위로 묶어 시작·끝 시간을 가진 청크로 만듦"""
+    from langchain.schema import Document
+
+    chunks, current, length = [], [], 0
+
+    def flush():
+        if current:
+            chunks.append(
+                Document(
+                    page_content=" ".join(doc.page_content for doc in current),
+                    metadata={
+                        "source": current[0].metadata.get("source"),
+                        "start": current[0].metadata["start"],
+                        "end": current[-1].metadata["end"],
+                    },
+                )
+            )
+
+    for segment in segments:
+        elapsed = segment.metadata["start"] - current[0].metadata["start"] if current else 0
+        if current and (
+            elapsed >= window_seconds
+            or length + 1 + len(segment.page_content) > max_chars
+        ):
+            flush()
+            current, length = [], 0
+        current.append(segment)
+        length += len(segment.page_content) + (1 if length else 0)
+    flush()
+
+    return chunks
+
+
+def transcript_text(docs):
+    separator = " " if is_timestamped(docs) else ""
+    return separator.join(doc.page_content for doc in docs)
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def timestamp_url(url, seconds):
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}t={int(seconds)}s"
+
+
+def render_transcript(load_docs, key, label="스크립트 보기"):
+    """스크립트를 펼쳤을 때만 load_docs()로 읽어 한 페이지씩 렌더링"""
+    if not st.toggle(label, key=f"{key}_show"):
+        return
+
+    docs = load_docs()
+
+    if is_timestamped(docs):
+        pages = [
+            docs[i : i + SEGMENTS_PER_PAGE]
+            for i in range(0, len(docs), SEGMENTS_PER_PAGE)
+        ]
+    else:
+        text = transcript_text(docs)
+        pages = [
+            text[i : i + CHARS_PER_PAGE] for i in range(0, len(text), CHARS_PER_PAGE)
+        ]
+    if not pages:
+        st.caption("스크립트가 비어 있습니다.")
+        return
+
+    page = 1
+    if len(pages) > 1:
+        page = st.number_input(
+            f"페이지 (총 {len(pages)})",
+            min_value=1,
+            max_value=len(pages),
+            value=1,
+            key=f"{key}_page",
+        )
+
+    with st.container(border=True, height=400):
+        if is_timestamped(docs):
+            st.markdown(
+                "\n\n".join(
+                    f"[{format_timestamp(doc.metadata['start'])}]"
+                    f"({timestamp_url(doc.metadata['source'], doc.metadata['start'])}) "
+                    f"{doc.page_content}"
+                    for doc in pages[page - 1]
+                )
+            )
+        else:
+            st.markdown(pages[page - 1])
@@ -1,11 +1,13 @@
-from langchain_community.document_transformers import DoctranTextTranslator  # type: ignore
-from langchain.schema.document import Document
-import dotenv
-
-dotenv.load_dotenv()
+import json
+import os
+from src.single_flight import single_flight
 
 
 def translate(text, target_language="ko"):
+    # Doctran/LangChain은 import 비용이 커서 번역할 때만 불러옴
+    from langchain_community.document_transformers import DoctranTextTranslator  # type: ignore
+    from langchain.schema.document import Document
+
     translator = DoctranTextTranslator(
         language=target_language, openai_api_model="gpt-4o-mini"
     )
@@ -13,3 +15,42 @@ def translate(text, target_language="ko"):
     translated_document = translator.transform_documents([text])
 
     return translated_document[0].page_content
+
+
+def translation_path(arxiv_id, target_language):
+    return f"./data/paper_csv/{arxiv_id}_{target_language}.json"
+
+
+def is_english(text, threshold=0.9):
+    # 글자 중 ASCII 알파벳 비율로 영어 여부를 대략 판단
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return False
+    return sum(c.isascii() for c in letters) / len(letters) >= threshold
+
+
+def translate_abstract(arxiv_id, abstract, target_language="ko"):
+    """초록 번역 결과를 ./data/paper_csv/{arxiv_id}_{lang}.json에 캐시"""
+    file_name = translation_path(arxiv_id, target_language)
+
+    def load():
+        with open(file_name, "r", encoding="utf-8-sig") as f:
+            return json.loads(f.read())["translated"]
+
+    def run():
+        translated = translate(abstract, target_language)
+        tmp_name = f"{file_name}.tmp-{os.getpid()}"
+        with open(tmp_name, "w", encoding="UTF-8-sig") as f:
+            f.write(
+                json.dumps(
+                    {"source": abstract, "translated": translated}, ensure_ascii=False
+                )
+            )
+        os.replace(tmp_name, file_name)
+        return translated
+
+    if os.path.exists(file_name):
+        return load()
+    return single_flight(
+        f"translate:{file_name}", run, done=lambda: os.path.exists(file_name), load=load
+    )
@@ -1,23 +1,30 @@
-from langchain.schema import Document
 import json
 import os
 import pandas as pd
 import streamlit as st
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
 
+if TYPE_CHECKING:
+    from langchain.schema import Document
 
-def save_docs_to_jsonl(array: Iterable[Document], file_path: str) -> None:
+
+def save_docs_to_jsonl(array: Iterable["Document"], file_path: str) -> None:
     # 파일의 디렉토리 경로를 추출하고 필요한 경우 생성
     directory = os.path.dirname(file_path)
     if directory and not os.path.exists(directory):
         os.makedirs(directory, exist_ok=True)
 
-    with open(file_path, "w") as jsonl_file:
+    # 임시 파일에 쓴 뒤 교체하여 다른 프로세스가 쓰다 만 파일을 읽지 않도록 함
+    tmp_path = f"{file_path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as jsonl_file:
         for doc in array:
             jsonl_file.write(doc.json() + "\n")
+    os.replace(tmp_path, file_path)
+
 
+def load_docs_from_jsonl(file_path) -> Iterable["Document"]:
+    from langchain.schema import Document
 
-def load_docs_from_jsonl(file_path) -> Iterable[Document]:
     array = []
     with open(file_path, "r") as jsonl_file:
         for line in jsonl_file:
@@ -37,3 +44,11 @@ def load_csv():
         # 기본 컬럼을 가진 빈 DataFrame 생성
         df = pd.DataFrame(columns=["Title", "Summary", "arxiv_id"])
     return df
+
+
+def current_user_id():
+    # Streamlit 세션 id (스크립트 실행 컨텍스트 밖에서는 "anonymous")
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "anonymous"
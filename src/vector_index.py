@@ -0,0 +1,193 @@
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+from src.single_flight import single_flight
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+FULL_DIMENSIONS = 3072
+INDEX_TYPES = ["flat", "sq8", "ivfpq"]
+# 논문 한 편(수백 개 청크)에는 IVF-PQ가 학습 데이터 부족으로 recall과 크기 모두 sq8보다 나쁨
+PAPER_INDEX_TYPES = ["flat", "sq8"]
+INDEX_CONFIG_FILE = "index_config.json"
+DEFAULT_INDEX_OPTIONS = {"dimensions": None, "index_type": "flat"}
+
+# 8bit PQ 코드북(256개 centroid)은 centroid당 39개 정도의 학습 벡터가 필요 (faiss 권장 기준)
+PQ_NBITS = 8
+MIN_PQ_TRAIN_SIZE = 39 * 2**PQ_NBITS
+
+
+def get_embeddings(dimensions=None):
+    from langchain.embeddings.openai import OpenAIEmbeddings
+
+    # text-embedding-3 모델은 dimensions 파라미터로 줄어든 임베딩을 바로 받을 수 있음
+    # 고정된 langchain-community 버전의 OpenAIEmbeddings에는 dimensions 필드가 없으므로 model_kwargs로 전달
+    if dimensions and dimensions != FULL_DIMENSIONS:
+        return OpenAIEmbeddings(
+            model=EMBEDDING_MODEL, model_kwargs={"dimensions": dimensions}
+        )
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+def reduce_dimensions(vectors, dimensions):
+    """text-embedding-3 벡터를 앞쪽 차원만 남기고 다시 정규화 (API의 dimensions와 동일한 방식)"""
+    import faiss
+
+    vectors = np.asarray(vectors, dtype="float32")
+    if not dimensions or dimensions >= vectors.shape[1]:
+        return vectors
+    reduced = np.ascontiguousarray(vectors[:, :dimensions])
+    faiss.normalize_L2(reduced)
+    return reduced
+
+
+def _pq_subquantizers(dimensions):
+    for m in (64, 48, 32, 16, 8, 4):
+        if dimensions % m == 0:
+            return m
+    return 1
+
+
+def create_faiss_index(vectors, index_type="flat"):
+    """벡터로 FAISS 인덱스를 만들어 반환 (벡터 수가 부족하면 ivfpq는 sq8로 대체)"""
+    import faiss
+
+    vectors = np.asarray(vectors, dtype="float32")
+    n, d = vectors.shape
+
+    if index_type == "ivfpq" and n < MIN_PQ_TRAIN_SIZE:
+        index_type = "sq8"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(d)
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit)
+        index.train(vectors)
+    elif index_type == "ivfpq":
+        nlist = max(1, min(int(4 * math.sqrt(n)), n // 39))
+        quantizer = faiss.IndexFlatL2(d)
+        index = faiss.IndexIVFPQ(quantizer, d, nlist, _pq_subquantizers(d), PQ_NBITS)
+        index.train(vectors)
+        index.nprobe = max(1, nlist // 4)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 타입입니다: {index_type}")
+
+    index.add(vectors)
+    return index
+
+
+def extract_vectors(index):
+    """인덱스에 저장된 벡터를 복원 (양자화 인덱스는 근사값)"""
+    import faiss
+
+    if isinstance(index, faiss.IndexIVF):
+        index.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def save_index_config(db_path, dimensions, index_type):
+    with open(os.path.join(db_path, INDEX_CONFIG_FILE), "w") as f:
+        json.dump(
+            {"model": EMBEDDING_MODEL, "dimensions": dimensions, "index_type": index_type},
+            f,
+        )
+
+
+def load_index_config(db_path):
+    # 설정 파일이 없는 기존 인덱스는 전체 차원의 flat 인덱스
+    config_path = os.path.join(db_path, INDEX_CONFIG_FILE)
+    if not os.path.exists(config_path):
+        return {"model": EMBEDDING_MODEL, "dimensions": None, "index_type": "flat"}
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+
+def index_matches(db_path, dimensions=None, index_type="flat"):
+    """저장된 인덱스가 주어진 차원·인덱스 타입으로 만들어졌는지 확인"""
+    config = load_index_config(db_path)
+    return (config["dimensions"] or FULL_DIMENSIONS) == (
+        dimensions or FULL_DIMENSIONS
+    ) and config["index_type"] == index_type
+
+
+def build_vector_store(docs, dimensions=None, index_type="flat"):
+    from langchain.docstore.in_memory import InMemoryDocstore
+    from langchain.vectorstores import FAISS
+
+    embeddings = get_embeddings(dimensions)
+    if index_type == "flat":
+        return FAISS.from_documents(docs, embeddings)
+
+    vectors = embeddings.embed_documents([doc.page_content for doc in docs])
+    index = create_faiss_index(vectors, index_type)
+    index_to_docstore_id = {i: str(i) for i in range(len(docs))}
+    docstore = InMemoryDocstore({str(i): doc for i, doc in enumerate(docs)})
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def load_vector_store(db_path):
+    from langchain.vectorstores import FAISS
+
+    config = load_index_config(db_path)
+    return FAISS.load_local(
+        db_path,
+        get_embeddings(config["dimensions"]),
+        allow_dangerous_deserialization=True,
+    )
+
+
+def save_vector_store(db, db_path, dimensions=None, index_type="flat"):
+    # 임시 디렉토리에 저장한 뒤 이름을 바꿔 쓰다 만 인덱스가 보이지 않도록 함
+    tmp_path = f"{db_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    db.save_local(tmp_path)
+    save_index_config(tmp_path, dimensions, index_type)
+    if os.path.exists(db_path):
+        shutil.rmtree(db_path)
+    os.rename(tmp_path, db_path)
+
+
+def get_text_splitter():
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=250,
+        chunk_overlap=50,
+        length_function=len,
+        is_separator_regex=False,
+        add_start_index=True,
+    )
+
+
+def load_or_build_vector_store(
+    db_path, load_docs, dimensions=None, index_type="flat", split=True, rebuild=False
+):
+    """저장된 인덱스가 있으면 불러오고, 없으면 load_docs()로 문서를 받아 한 번만 생성
+
+    split=False면 load_docs()가 이미 청크로 나눈 문서를 반환한다고 보고 그대로 사용
+    rebuild=True면 저장된 인덱스가 다른 옵션으로 만들어졌을 때 주어진 옵션으로 다시 생성
+    """
+    if os.path.exists(db_path) and not rebuild:
+        return load_vector_store(db_path)
+
+    def build():
+        docs = load_docs()
+        if split:
+            docs = get_text_splitter().split_documents(docs)
+        db = build_vector_store(docs, dimensions, index_type)
+        save_vector_store(db, db_path, dimensions, index_type)
+        return db
+
+    def done():
+        if not os.path.exists(db_path):
+            return False
+        return not rebuild or index_matches(db_path, dimensions, index_type)
+
+    return single_flight(
+        f"index:{db_path}",
+        build,
+        done=done,
+        load=lambda: load_vector_store(db_path),
+    )
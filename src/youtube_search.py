@@ -1,7 +1,6 @@
-from googleapiclient.discovery import build
-
-
 def search_youtube(query, api_key, max_results=5):
+    from googleapiclient.discovery import build
+
     # Build the YouTube service object
     youtube = build("youtube", "v3", developerKey=api_key)
 